@@ -0,0 +1,113 @@
+import random
+import time
+
+from benchmarks.common import Measurement
+from constants import AVAILABLE_PLAYER_TYPES
+from games.connect4.action import Connect4Action
+from games.connect4.players.human import HumanConnect4Player
+from games.connect4.state import Connect4State
+
+SEED = 1234
+
+"""
+the positions of the accuracy benchmark, as the columns played from the empty 6x7 board, and the exact score of each
+move, from the point of view of the player to move (see Connect4Solver). The positions were played at random from
+fixed seeds, with 12 to 25 empty cells, and kept when no player can win right away, a single move has the best score,
+and some moves change the outcome of the game. They are sorted by the number of empty cells
+"""
+POSITIONS = [
+    ("015561641550453352160611224023", {0: -1, 2: 2, 3: 2, 4: 5, 6: -4}),
+    ("024154300111424035166331005336", {2: 0, 4: 4, 5: 5, 6: 0}),
+    ("55115442020246542620650420164", {0: -2, 1: 3, 3: -5, 5: -2, 6: -2}),
+    ("6512114555611000215604066056", {2: -3, 3: -5, 4: 4}),
+    ("6242602005465503126344152464", {0: 5, 1: 6, 2: -6, 3: -7, 5: -2, 6: -6}),
+    ("604045552301150550164446011", {1: -5, 2: -2, 3: 6, 4: -5, 6: 5}),
+    ("64451230451355235133250122", {0: -3, 1: 3, 2: -3, 3: -3, 4: -1, 6: -3}),
+    ("20543255651153214415023234", {0: -7, 1: -7, 2: -6, 3: 1, 4: -7, 6: -6}),
+    ("0024552522266404454340115", {0: 6, 1: 6, 2: 6, 3: -8, 5: 6, 6: 7}),
+    ("551353111666053624662335", {0: -8, 1: -8, 2: 3, 3: -8, 4: -9, 5: -8}),
+    ("436134021666651004432060", {0: 0, 1: 8, 2: -9, 3: 2, 4: 0, 5: -9}),
+    ("21666222660150156423403", {0: 3, 1: -4, 2: -4, 3: -1, 4: 0, 5: -8}),
+    ("2551665601126261003061", {0: -9, 1: -9, 2: -9, 3: -5, 4: -8, 5: 0}),
+    ("4023035420215442002331", {0: -9, 1: -7, 2: -9, 3: -9, 4: -9, 5: 7, 6: -9}),
+    ("655664536101224224163", {0: -2, 1: -7, 2: -5, 3: 0, 4: 9, 5: -1, 6: -2}),
+    ("53505513210456102016", {0: 0, 1: 2, 2: 2, 3: 3, 4: -2, 5: -2, 6: -1}),
+    ("31625132501420050356", {0: 10, 1: 3, 2: 2, 3: 7, 4: -10, 5: 0, 6: 7}),
+    ("2365124115663421106", {0: -10, 1: -4, 2: -4, 3: 10, 4: 9, 5: 8, 6: -4}),
+    ("665606126315465143", {0: -2, 1: 1, 2: -10, 3: 3, 4: 8, 5: 2}),
+    ("253256060240244001", {0: -10, 1: 1, 2: -10, 3: 0, 4: -10, 5: -10, 6: -10}),
+    ("61663516660441002", {0: -11, 1: -11, 2: -7, 3: 1, 4: -11, 5: -7}),
+]
+
+"""
+the quick runs only use one position out of this number, so they still cover all the stages of the game
+"""
+QUICK_STEP = 3
+
+"""
+the player types that can't be benchmarked, as they don't choose their moves by themselves
+"""
+EXCLUDED_PLAYER_TYPES = [HumanConnect4Player]
+
+
+def get_position(moves: str) -> Connect4State:
+    state = Connect4State()
+    for col in moves:
+        state.update(Connect4Action(int(col)))
+    return state
+
+
+# the outcome of a score: 1 for a win, 0 for a draw and -1 for a loss
+def __get_outcome(score: int) -> int:
+    return (score > 0) - (score < 0)
+
+
+"""
+Scores the moves of a player on the positions: the share of the positions where it plays one of the best moves, the
+share of the positions where its move changes the outcome of the game (a win that is no longer a win, or a draw that
+becomes a loss), and its average time per move
+"""
+def score_player(player, positions: list) -> tuple:
+    num_best_moves = 0
+    num_blunders = 0
+    seconds = 0.0
+    for moves, scores in positions:
+        state = get_position(moves)
+        player.set_current_pos(state.get_acting_player())
+
+        start = time.perf_counter()
+        action = player.get_action(state.clone())
+        seconds += time.perf_counter() - start
+
+        best_score = max(scores.values())
+        score = scores.get(action.get_col())
+        if score is None:
+            # an invalid move loses the game, and is worse than any valid move
+            score = min(min(scores.values()), 0) - 1
+        num_best_moves += score == best_score
+        num_blunders += __get_outcome(score) < __get_outcome(best_score)
+    return num_best_moves / len(positions), num_blunders / len(positions), seconds / len(positions)
+
+
+"""
+Measures the move accuracy of each connect4 player type against positions with known scores, along with its time per
+move, so players can be compared without playing full tournaments
+:param quick: if True, only some of the positions are used
+"""
+def run_benchmarks(quick: bool = False) -> dict:
+    positions = POSITIONS[::QUICK_STEP] if quick else POSITIONS
+
+    results = {}
+    for player_type in AVAILABLE_PLAYER_TYPES["connect4"]:
+        if player_type in EXCLUDED_PLAYER_TYPES:
+            continue
+
+        # each player type keeps the same instance for all the positions, like in a game
+        random.seed(SEED)
+        accuracy, blunders, seconds = score_player(player_type(player_type.__name__), positions)
+
+        prefix = f"accuracy/{player_type.__name__}"
+        results[f"{prefix}/best-moves"] = Measurement(accuracy * 100, "%", True)
+        results[f"{prefix}/blunders"] = Measurement(blunders * 100, "%", False)
+        results[f"{prefix}/time-per-move"] = Measurement(seconds * 1e3, "ms/move", False)
+    return results
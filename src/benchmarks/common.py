@@ -0,0 +1,62 @@
+import time
+from collections import namedtuple
+
+"""
+The result of a benchmark: the measured value, its unit and whether higher values are better
+"""
+Measurement = namedtuple('Measurement', ['value', 'unit', 'higher_is_better'])
+
+
+"""
+Measures the average time of a function call, keeping the best of several repeats to reduce the noise
+:param function: the function to measure (called without arguments)
+:param number: number of calls in each repeat
+:param repeat: number of repeats
+:returns: the time of a single call, in seconds
+"""
+def time_per_call(function, number: int, repeat: int = 5) -> float:
+    best = float('inf')
+    for _ in range(repeat):
+        start = time.perf_counter()
+        for _ in range(number):
+            function()
+        best = min(best, time.perf_counter() - start)
+    return best / number
+
+
+"""
+Measures how many times a function can be called per second
+:param function: the function to measure (called without arguments)
+:param min_time: minimum duration of the measurement, in seconds
+:returns: the number of calls per second
+"""
+def calls_per_second(function, min_time: float) -> float:
+    calls = 0
+    start = time.perf_counter()
+    elapsed = 0.0
+    while elapsed < min_time:
+        function()
+        calls += 1
+        elapsed = time.perf_counter() - start
+    return calls / elapsed
+
+
+"""
+Compares measurements with a baseline
+:param results: the current measurements, by benchmark name
+:param baseline: the baseline measurements, by benchmark name
+:param threshold: the relative change that is considered a regression (e.g., 0.1 for 10%)
+:returns: a list with (name, baseline value, current value, relative change, is regression), for the benchmarks in both
+"""
+def compare(results: dict, baseline: dict, threshold: float) -> list:
+    rows = []
+    for name, measurement in results.items():
+        if name not in baseline:
+            continue
+        reference = baseline[name].value
+        if reference == 0:
+            continue
+        change = (measurement.value - reference) / reference
+        worse = -change if measurement.higher_is_better else change
+        rows.append((name, reference, measurement.value, change, worse > threshold))
+    return rows
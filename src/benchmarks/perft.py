@@ -0,0 +1,89 @@
+import time
+
+from benchmarks.common import Measurement
+from games.connect4.action import Connect4Action
+from games.connect4.players.minimax import MinimaxConnect4Player
+from games.connect4.state import Connect4State
+
+"""
+the positions of the perft benchmark, as the columns played from the empty 6x7 board, and the number of positions
+reached after each number of moves from them (the perft counts, from depth 0). Apart from the empty board, the
+positions were played at random from fixed seeds, among the ones where the minimax player has to search (it has no
+winning or blocking move), and their counts were computed with the original grid-based Connect4State, which cloned the
+state at each move
+"""
+POSITIONS = {
+    "empty": ("", [1, 7, 49, 343, 2401, 16807, 117649, 823536]),
+    "midgame": ("1466602036", [1, 7, 49, 342, 2376, 16164, 110224]),
+    "late-midgame": ("216040266642552523044110", [1, 7, 48, 314, 1953, 11263, 61935]),
+    "endgame": ("556612556062410330012343311255", [1, 6, 34, 175, 758, 2772, 8543, 21310]),
+}
+
+"""
+the deepest perft depth of the quick runs
+"""
+QUICK_DEPTH = 5
+
+"""
+the search depth of the minimax player on the perft positions
+"""
+SEARCH_DEPTH = 5
+
+
+"""
+Counts the positions reached after a number of moves. The finished games have no moves, so they are only counted if
+they are reached at the last move
+"""
+def perft(state: Connect4State, depth: int) -> int:
+    if depth == 0:
+        return 1
+    if state.is_finished():
+        return 0
+    count = 0
+    for action in state.get_possible_actions():
+        state.update(action)
+        count += perft(state, depth - 1)
+        state.undo()
+    return count
+
+
+def get_position(moves: str) -> Connect4State:
+    state = Connect4State()
+    for col in moves:
+        state.update(Connect4Action(int(col)))
+    return state
+
+
+"""
+Measures the positions per second of perft on fixed connect4 positions, checking the counts against the known ones,
+and the nodes per second of the minimax player on the same positions
+:param quick: if True, perft stops at a lower depth and the minimax search is shallower
+"""
+def run_benchmarks(quick: bool = False) -> dict:
+    results = {}
+    for name, (moves, counts) in POSITIONS.items():
+        depth = min(QUICK_DEPTH, len(counts) - 1) if quick else len(counts) - 1
+        state = get_position(moves)
+
+        start = time.perf_counter()
+        count = perft(state, depth)
+        seconds = time.perf_counter() - start
+
+        if count != counts[depth]:
+            raise Exception(f"perft of the {name} position at depth {depth} is {count}, expected {counts[depth]}")
+        results[f"perft/connect4/{name}/depth{depth}"] = Measurement(count / seconds, "positions/s", True)
+
+    search_depth = SEARCH_DEPTH - 1 if quick else SEARCH_DEPTH
+    for name, (moves, _counts) in POSITIONS.items():
+        # a new player for each search, so nothing is reused from a previous search, and no book moves
+        state = get_position(moves)
+        player = MinimaxConnect4Player("Minimax", search_depth, opening_book=None)
+        player.set_current_pos(state.get_acting_player())
+
+        start = time.perf_counter()
+        player.get_action(state)
+        seconds = time.perf_counter() - start
+
+        results[f"perft/connect4/{name}/minimax-depth{search_depth}"] = \
+            Measurement(player.get_num_nodes() / seconds, "nodes/s", True)
+    return results
@@ -0,0 +1,88 @@
+import argparse
+import json
+import sys
+
+from benchmarks import accuracy, perft, search, simulators, sizes, states
+from benchmarks.common import Measurement, compare
+
+"""
+The available benchmark suites
+"""
+SUITES = {
+    "games": simulators.run_benchmarks,
+    "states": states.run_benchmarks,
+    "search": search.run_benchmarks,
+    "perft": perft.run_benchmarks,
+    "sizes": sizes.run_benchmarks,
+    "accuracy": accuracy.run_benchmarks,
+}
+
+
+def load_measurements(path: str) -> dict:
+    with open(path) as file:
+        return {name: Measurement(**measurement) for name, measurement in json.load(file).items()}
+
+
+def save_measurements(path: str, measurements: dict):
+    with open(path, 'w') as file:
+        json.dump({name: measurement._asdict() for name, measurement in measurements.items()}, file, indent=2)
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Run the performance benchmarks of the games.')
+
+    parser.add_argument('--suite', action='append', choices=SUITES.keys(),
+                        help='Benchmark suite to run. Can be specified several times. Defaults to all suites.')
+
+    parser.add_argument('--quick', action='store_true', default=False,
+                        help='Run shorter benchmarks, with more noise. Defaults to False.')
+
+    parser.add_argument('--output', default=None,
+                        help='JSON file where the results are written.')
+
+    parser.add_argument('--baseline', default=None,
+                        help='JSON file with the baseline results to compare with.')
+
+    parser.add_argument('--threshold', type=float, default=0.15,
+                        help='Relative change against the baseline that is reported as a regression. Defaults to 0.15.')
+
+    parser.add_argument('--save-baseline', action='store_true', default=False,
+                        help='Write the results to the baseline file instead of comparing with it. Defaults to False.')
+
+    args = parser.parse_args()
+
+    if args.save_baseline and args.baseline is None:
+        parser.error('--save-baseline requires --baseline.')
+
+    results = {}
+    for suite in args.suite or SUITES.keys():
+        print(f"Running {suite} benchmarks...")
+        results.update(SUITES[suite](args.quick))
+
+    for name, measurement in results.items():
+        print(f"{name:<80} {measurement.value:>14.3f} {measurement.unit}")
+
+    if args.output is not None:
+        save_measurements(args.output, results)
+
+    if args.baseline is None:
+        return
+
+    if args.save_baseline:
+        save_measurements(args.baseline, results)
+        print(f"Baseline saved to {args.baseline}")
+        return
+
+    regressions = 0
+    print(f"\nComparison with {args.baseline} (threshold: {args.threshold:.0%}):")
+    for name, reference, value, change, is_regression in compare(results, load_measurements(args.baseline), args.threshold):
+        regressions += is_regression
+        print(f"{name:<80} {reference:>14.3f} -> {value:>14.3f} ({change:+.1%}){' REGRESSION' if is_regression else ''}")
+
+    if regressions > 0:
+        print(f"{regressions} benchmark(s) regressed")
+        sys.exit(1)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,130 @@
+import os
+import random
+import time
+
+from benchmarks.common import Measurement
+from benchmarks.states import get_positions
+from games.connect4.players.mcts import MCTSConnect4Player
+from games.connect4.players.minimax import MinimaxConnect4Player
+from games.connect4.simulator import Connect4Simulator
+from games.connect4.state import Connect4State
+from games.connect4.transposition_table import get_shared_table
+
+"""
+the search depths of the minimax player that are measured
+"""
+DEPTHS = [3, 4]
+
+"""
+the search depth and the numbers of processes of the parallel minimax search that are measured: the serial search,
+then twice the processes each time, up to one per core (and at least 2)
+"""
+PARALLEL_DEPTH = 6
+PARALLEL_WORKERS = sorted({1, 2, os.cpu_count() or 1} |
+                          {1 << power for power in range(((os.cpu_count() or 1) - 1).bit_length())})
+
+"""
+the playouts of each MCTS search that is measured
+"""
+NUM_PLAYOUTS = 2000
+
+"""
+the time per move of both players and the number of games of the strength benchmark, where MCTS plays against a
+minimax player with the same time budget (without its opening book, so both players search every move)
+"""
+TIME_PER_MOVE = 0.05
+NUM_STRENGTH_GAMES = 10
+SEED = 1234
+
+
+"""
+Measures the nodes per second of the connect4 search players, on the empty board and on a fixed, seeded position
+:param quick: if True, only the lowest depth is measured
+"""
+def run_benchmarks(quick: bool = False) -> dict:
+    positions = {"empty": Connect4State(), "midgame": get_positions()["connect4"]}
+
+    results = {}
+    for depth in DEPTHS[:1] if quick else DEPTHS:
+        for position_name, state in positions.items():
+            # a new player for each search, and no book moves. The transposition table is shared by the players of
+            # the process, so a first search allocates it, and it is cleared so nothing is reused from that search
+            player = MinimaxConnect4Player("Minimax", depth, opening_book=None)
+            player.set_current_pos(state.get_acting_player())
+            player.get_action(state.clone())
+            player.transposition_table.clear()
+            num_nodes = player.get_num_nodes()
+
+            start = time.perf_counter()
+            player.get_action(state.clone())
+            seconds = time.perf_counter() - start
+
+            name = f"search/MinimaxConnect4Player/depth{depth}/{position_name}"
+            results[name] = Measurement((player.get_num_nodes() - num_nodes) / seconds, "nodes/s", True)
+
+    # the speedup of the parallel search is measured against the serial search, with the nodes per second and the
+    # number of nodes, as the split search visits more nodes than the serial one
+    serial_seconds = None
+    for workers in PARALLEL_WORKERS:
+        seconds, num_nodes = measure_parallel_search(positions["midgame"], workers)
+        name = f"search/MinimaxConnect4Player/depth{PARALLEL_DEPTH}/workers{workers}/midgame"
+        results[name] = Measurement(num_nodes / seconds, "nodes/s", True)
+        results[f"{name}/nodes"] = Measurement(num_nodes, "nodes", False)
+        if serial_seconds is None:
+            serial_seconds = seconds
+        else:
+            results[f"{name}/speedup"] = Measurement(serial_seconds / seconds, "x", True)
+
+    for position_name, state in positions.items():
+        random.seed(SEED)
+        player = MCTSConnect4Player("MCTS", NUM_PLAYOUTS // 4 if quick else NUM_PLAYOUTS)
+
+        start = time.perf_counter()
+        player.get_action(state.clone())
+        seconds = time.perf_counter() - start
+
+        name = f"search/MCTSConnect4Player/{position_name}"
+        results[name] = Measurement(player.get_total_playouts() / seconds, "playouts/s", True)
+
+    results["search/MCTSConnect4Player-vs-MinimaxConnect4Player/score"] = \
+        Measurement(get_mcts_score(NUM_STRENGTH_GAMES // 5 if quick else NUM_STRENGTH_GAMES), "score/game", True)
+    return results
+
+
+"""
+Measures a search of the minimax player with a number of processes. The transposition tables are shared by the players
+of a process, and the worker processes are forked with a copy of them, so the search starts with new tables. The worker
+processes are started by a first search on the empty board, so their start is not counted, and the table of this
+process is cleared after it
+:return: the time of the search, in seconds, and its number of nodes
+"""
+def measure_parallel_search(state: Connect4State, workers: int):
+    get_shared_table.cache_clear()
+    player = MinimaxConnect4Player("Minimax", PARALLEL_DEPTH, opening_book=None, workers=workers)
+    player.set_current_pos(0)
+    player.get_action(Connect4State())
+    player.transposition_table.clear()
+
+    num_nodes = player.get_num_nodes()
+    player.set_current_pos(state.get_acting_player())
+    start = time.perf_counter()
+    player.get_action(state.clone())
+    return time.perf_counter() - start, player.get_num_nodes() - num_nodes
+
+
+"""
+Plays MCTS against minimax with the same time per move, swapping seats after each game
+:return: the average score of MCTS, between -1 (always loses) and 1 (always wins)
+"""
+def get_mcts_score(num_games: int) -> float:
+    # minimax doesn't reuse the positions searched by the other benchmarks
+    get_shared_table.cache_clear()
+    random.seed(SEED)
+    simulator = Connect4Simulator([
+        MCTSConnect4Player("MCTS", num_playouts=None, time_limit=TIME_PER_MOVE),
+        MinimaxConnect4Player("Minimax", depth=64, time_limit=TIME_PER_MOVE, opening_book=None)
+    ])
+    for _game in range(num_games):
+        simulator.run_simulation()
+        simulator.change_player_positions()
+    return simulator.get_running_scores()["MCTS"].get_mean()
@@ -0,0 +1,68 @@
+import random
+
+from benchmarks.common import Measurement, calls_per_second
+from games.connect4.players.greedy import GreedyConnect4Player
+from games.connect4.players.random import RandomConnect4Player
+from games.connect4.players.surefire import SurefireConnect4Player
+from games.connect4.simulator import Connect4Simulator
+from games.hlpoker.players.always_call import AlwaysCallHLPokerPlayer
+from games.hlpoker.players.random import RandomHLPokerPlayer
+from games.hlpoker.simulator import HLPokerSimulator
+from games.minesweeper.players.random import RandomMinesweeperPlayer
+from games.minesweeper.simulator import MinesweeperSimulator
+
+SEED = 1234
+
+"""
+The matchups used to measure the games per second of each simulator, with the built-in players that are cheap enough
+for the simulator to dominate the time
+"""
+MATCHUPS = [
+    (Connect4Simulator, [RandomConnect4Player, RandomConnect4Player]),
+    (Connect4Simulator, [GreedyConnect4Player, GreedyConnect4Player]),
+    (MinesweeperSimulator, [RandomMinesweeperPlayer, RandomMinesweeperPlayer]),
+    (HLPokerSimulator, [AlwaysCallHLPokerPlayer, AlwaysCallHLPokerPlayer]),
+    (HLPokerSimulator, [RandomHLPokerPlayer, AlwaysCallHLPokerPlayer]),
+]
+
+"""
+The matchups of players that can also play in batches, and the number of games of each batch
+"""
+BATCHED_MATCHUPS = [
+    (Connect4Simulator, [RandomConnect4Player, RandomConnect4Player]),
+    (Connect4Simulator, [GreedyConnect4Player, GreedyConnect4Player]),
+    (Connect4Simulator, [SurefireConnect4Player, RandomConnect4Player]),
+]
+BATCH_SIZE = 1 << 14
+
+
+"""
+Measures the end-to-end games per second of each simulator, without and with profiling, so the cost of the latency
+measurements is tracked in both cases
+:param quick: if True, each benchmark runs for a shorter time
+"""
+def run_benchmarks(quick: bool = False) -> dict:
+    min_time = 0.5 if quick else 2.0
+
+    results = {}
+    for simulator_type, player_types in MATCHUPS:
+        name = f"games/{simulator_type.__name__}/{'-vs-'.join(player_type.__name__ for player_type in player_types)}"
+        for profile in (False, True):
+            random.seed(SEED)
+            simulator = simulator_type([player_type(f"P{pos}") for pos, player_type in enumerate(player_types)])
+            if profile:
+                simulator.enable_profiling()
+
+            results[f"{name}/profiled" if profile else name] = \
+                Measurement(calls_per_second(simulator.run_simulation, min_time), "games/s", True)
+
+    for simulator_type, player_types in BATCHED_MATCHUPS:
+        random.seed(SEED)
+        simulator = simulator_type([player_type(f"P{pos}") for pos, player_type in enumerate(player_types)])
+        if not simulator.can_run_batched():
+            continue
+
+        name = f"games/{simulator_type.__name__}/batched/{'-vs-'.join(player_type.__name__ for player_type in player_types)}"
+        batches_per_second = calls_per_second(lambda: simulator.run_batched_simulations(BATCH_SIZE), min_time)
+        results[name] = Measurement(batches_per_second * BATCH_SIZE, "games/s", True)
+    return results
@@ -0,0 +1,94 @@
+import random
+import time
+
+from benchmarks.common import Measurement, calls_per_second
+from games.connect4.players.minimax import MinimaxConnect4Player
+from games.connect4.players.random import RandomConnect4Player
+from games.connect4.simulator import Connect4Simulator
+from games.connect4.state import Connect4State
+
+SEED = 1234
+
+"""
+the connect4 board sizes that are measured, as (num_rows, num_cols)
+"""
+SIZES = [(6, 7), (12, 14), (20, 20), (32, 32)]
+
+"""
+the search depth of the minimax player, and the number of random moves played before the search
+"""
+SEARCH_DEPTH = 3
+NUM_PLIES = 10
+
+"""
+the number of games of each batch of the batched engine
+"""
+BATCH_SIZE = 1 << 10
+
+
+# plays a random game on a state, and returns the number of moves
+def __play_random_game(num_rows: int, num_cols: int) -> int:
+    state = Connect4State(num_rows, num_cols)
+    num_moves = 0
+    while not state.is_finished():
+        state.update(random.choice(state.get_possible_actions()))
+        num_moves += 1
+    return num_moves
+
+
+def __random_position(num_rows: int, num_cols: int) -> Connect4State:
+    # the seed is changed until the random moves leave a game where no move wins right away, so the minimax player
+    # has to search
+    seed = SEED
+    while True:
+        rng = random.Random(seed)
+        state = Connect4State(num_rows, num_cols)
+        for _ply in range(NUM_PLIES):
+            state.update(rng.choice(state.get_possible_actions()))
+        if not state.is_finished() and not any(state.is_winning_action(action, player)
+                                                   for action in state.get_possible_actions() for player in range(2)):
+            return state
+        seed += 1
+
+
+"""
+Measures how the connect4 simulator, state, batched engine and minimax search scale with the size of the board: the
+games per second of random players, the moves per second of random games played on the state, the games per second of
+the batched engine and the nodes per second of the minimax player
+:param quick: if True, each benchmark runs for a shorter time and the search is shallower
+"""
+def run_benchmarks(quick: bool = False) -> dict:
+    min_time = 0.5 if quick else 2.0
+
+    results = {}
+    for num_rows, num_cols in SIZES:
+        prefix = f"sizes/{num_rows}x{num_cols}"
+
+        random.seed(SEED)
+        simulator = Connect4Simulator([RandomConnect4Player("P0"), RandomConnect4Player("P1")], num_rows, num_cols)
+        results[f"{prefix}/games"] = Measurement(calls_per_second(simulator.run_simulation, min_time), "games/s", True)
+
+        random.seed(SEED)
+        num_moves = 0
+        start = time.perf_counter()
+        while time.perf_counter() - start < min_time:
+            num_moves += __play_random_game(num_rows, num_cols)
+        results[f"{prefix}/moves"] = Measurement(num_moves / (time.perf_counter() - start), "moves/s", True)
+
+        random.seed(SEED)
+        if simulator.can_run_batched():
+            batches_per_second = calls_per_second(lambda: simulator.run_batched_simulations(BATCH_SIZE), min_time)
+            results[f"{prefix}/batched-games"] = Measurement(batches_per_second * BATCH_SIZE, "games/s", True)
+
+        # a new player for each search, so nothing is reused from a previous search
+        state = __random_position(num_rows, num_cols)
+        depth = SEARCH_DEPTH - 1 if quick else SEARCH_DEPTH
+        player = MinimaxConnect4Player("Minimax", depth, opening_book=None)
+        player.set_current_pos(state.get_acting_player())
+
+        start = time.perf_counter()
+        player.get_action(state)
+        seconds = time.perf_counter() - start
+
+        results[f"{prefix}/minimax-depth{depth}"] = Measurement(player.get_num_nodes() / seconds, "nodes/s", True)
+    return results
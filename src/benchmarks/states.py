@@ -0,0 +1,76 @@
+import random
+
+from benchmarks.common import Measurement, time_per_call
+from games.connect4.state import Connect4State
+from games.hlpoker.action import HLPokerAction
+from games.hlpoker.state import HLPokerState
+from games.minesweeper.state import MinesweeperState
+
+SEED = 1234
+
+"""
+number of random moves played from the initial state to build the positions of connect4 and minesweeper
+"""
+NUM_PLIES = 10
+
+
+def __random_position(state, seed: int):
+    rng = random.Random(seed)
+    for _ in range(NUM_PLIES):
+        state.update(rng.choice(list(state.get_possible_actions())))
+    return state
+
+
+"""
+Builds a fixed, seeded, unfinished position for each game
+"""
+def get_positions() -> dict:
+    positions = {}
+
+    # the seed is changed until the random moves leave an unfinished game
+    seed = SEED
+    while True:
+        connect4 = __random_position(Connect4State(), seed)
+        if not connect4.is_finished():
+            break
+        seed += 1
+    positions["connect4"] = connect4
+
+    # the mines are placed with the global random generator
+    random.seed(SEED)
+    positions["minesweeper"] = __random_position(MinesweeperState(), SEED)
+
+    hlpoker = HLPokerState(2)
+    for action in [HLPokerAction.RAISE, HLPokerAction.CALL, HLPokerAction.CALL]:
+        hlpoker.update(action)
+    positions["hlpoker"] = hlpoker
+
+    return positions
+
+
+"""
+Measures the cost of the primitives of each game state on fixed positions
+:param quick: if True, each benchmark makes fewer calls
+"""
+def run_benchmarks(quick: bool = False) -> dict:
+    number = 200 if quick else 2000
+    repeat = 3 if quick else 5
+
+    results = {}
+    for game, state in get_positions().items():
+        action = list(state.get_possible_actions())[0]
+
+        # update changes the state, so each call gets its own copy, made before the measurement
+        copies = iter([state.clone() for _ in range(number * repeat)])
+
+        primitives = {
+            "clone": state.clone,
+            "update": lambda: next(copies).update(action),
+            "validate_action": lambda: state.validate_action(action),
+            "get_possible_actions": lambda: list(state.get_possible_actions()),
+            "is_finished": state.is_finished,
+        }
+        for primitive, function in primitives.items():
+            seconds = time_per_call(function, number, repeat)
+            results[f"states/{game}/{primitive}"] = Measurement(seconds * 1e6, "us/call", False)
+    return results
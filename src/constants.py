@@ -37,7 +37,9 @@ def __get_player_types(base_class):
             module = importlib.import_module(modname)
             for attribute_name in dir(module):
                 attribute = getattr(module, attribute_name)
-                if isclass(attribute) and issubclass(attribute, base_class) and attribute is not base_class:
+                # a player imported by another module is only registered by the module that defines it
+                if isclass(attribute) and issubclass(attribute, base_class) and attribute is not base_class \
+                        and attribute.__module__ == module.__name__:
                     subclasses.append(attribute)
         except ImportError:
             continue  # Skip modules that can't be imported
@@ -1,3 +1,6 @@
+from functools import lru_cache
+
+
 class Connect4Action:
     """
     a connect 4 action is simple - it only takes the value of the column to play
@@ -9,3 +12,11 @@ class Connect4Action:
 
     def get_col(self):
         return self.__col
+
+
+"""
+Gets the action of each column of a board. Actions are never changed, so all the states of a board size share them
+"""
+@lru_cache(maxsize=None)
+def get_column_actions(num_cols: int) -> tuple:
+    return tuple(Connect4Action(col) for col in range(num_cols))
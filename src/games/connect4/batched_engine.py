@@ -0,0 +1,197 @@
+from abc import ABC, abstractmethod
+from functools import lru_cache
+
+import numpy as np
+
+from games.connect4.lines import get_lines
+from games.connect4.players.greedy import GreedyConnect4Player
+from games.connect4.players.random import RandomConnect4Player
+from games.connect4.players.surefire import SurefireConnect4Player
+
+"""
+the value of the empty cells, and of the extra cell that pads the windows of the cells that are in less windows than
+others. The extra cell never belongs to a player, so it never completes a line
+"""
+EMPTY_CELL = -1
+SENTINEL = -9
+
+
+"""
+Gets the windows of 4 cells that contain each cell of a board, as cell indexes (col * num_rows + height) with shape
+(num_cells, max_windows, 4). The cells that are in fewer windows are padded with windows of the sentinel cell
+(index num_cells)
+"""
+@lru_cache(maxsize=None)
+def get_cell_windows(num_rows: int, num_cols: int):
+    lines = get_lines(num_rows, num_cols)
+    max_windows = max(len(cell_lines) for cell_lines in lines.cell_lines)
+    padding = [num_rows * num_cols] * 4
+    return np.array([[lines.lines[index] for index in cell_lines] + [padding] * (max_windows - len(cell_lines))
+                     for cell_lines in lines.cell_lines], dtype=np.intp)
+
+
+class BatchedPolicy(ABC):
+    """
+    Chooses the actions of one player in many connect4 games at once. Policies play the same way as the player they
+    stand for, so games played in batches have the same outcomes, on average, as the games played one by one
+    """
+
+    """
+    :param heights: the number of checkers in each column of each game, with shape (num_games, num_cols)
+    :param counts: the number of checkers of the acting player in each column of each game, with the same shape
+    :param num_rows: the number of rows of the boards
+    :param rng: the numpy random generator to use
+    :return: the column to play in each game
+    """
+    @abstractmethod
+    def get_actions(self, heights, counts, num_rows: int, rng):
+        pass
+
+
+class RandomBatchedPolicy(BatchedPolicy):
+    # plays any column that is not full, with the same probability. The games where a full column is drawn draw again,
+    # which only happens for a few of them
+    def get_actions(self, heights, counts, num_rows: int, rng):
+        num_games, num_cols = heights.shape
+        cols = rng.integers(0, num_cols, num_games)
+        redraw = np.flatnonzero(heights[np.arange(num_games), cols] >= num_rows)
+        while len(redraw) > 0:
+            cols[redraw] = rng.integers(0, num_cols, len(redraw))
+            redraw = redraw[heights[redraw, cols[redraw]] >= num_rows]
+        return cols
+
+
+class GreedyBatchedPolicy(BatchedPolicy):
+    # plays the column with the most checkers of the player. Like the greedy player, the columns are scanned from left to
+    # right, and a column with the same count replaces the selected one half of the times
+    def get_actions(self, heights, counts, num_rows: int, rng):
+        num_games, num_cols = heights.shape
+        selected = np.full(num_games, -1)
+        max_counts = np.zeros(num_games, dtype=counts.dtype)
+        # one random bit per column
+        coins = rng.integers(0, 1 << num_cols, num_games)
+        for col in range(num_cols):
+            count = counts[:, col]
+            coin = ((coins >> col) & 1) == 1
+            swap = (heights[:, col] < num_rows) \
+                & ((selected < 0) | (count > max_counts) | ((count == max_counts) & coin))
+            selected[swap] = col
+            max_counts[swap] = count[swap]
+        return selected
+
+
+class SurefireBatchedPolicy(BatchedPolicy):
+    # plays the column closest to the center that is not full, preferring the left one on ties
+    def get_actions(self, heights, counts, num_rows: int, rng):
+        num_cols = heights.shape[1]
+        distances = np.abs(np.arange(num_cols) - num_cols // 2)
+        distances = np.where(heights < num_rows, distances, num_cols)
+        return distances.argmin(axis=1)
+
+
+"""
+The policies of the built-in players that can play in batches. Only exact types are matched, as a subclass may play
+differently
+"""
+BATCHED_POLICIES = {
+    RandomConnect4Player: RandomBatchedPolicy,
+    GreedyConnect4Player: GreedyBatchedPolicy,
+    SurefireConnect4Player: SurefireBatchedPolicy,
+}
+
+
+"""
+Gets the batched policy of a player, or None if the player can't play in batches
+"""
+def get_batched_policy(player):
+    policy_type = BATCHED_POLICIES.get(type(player))
+    return None if policy_type is None else policy_type()
+
+
+class BatchedConnect4Engine:
+    """
+    Plays many connect4 games in lockstep: the boards are stored in numpy arrays, and each step plays one move in
+    every game that is not finished
+    """
+
+    def __init__(self, num_rows: int = 6, num_cols: int = 7):
+        self.__num_rows = num_rows
+        self.__num_cols = num_cols
+
+        """
+        boards that fit in 64 bits are stored as one bitboard per player, like Connect4State, and the wins are found
+        with shifts and masks. The larger ones are stored as arrays of cells, and the wins are found by checking the
+        windows of 4 cells that contain the new checker
+        """
+        self.__stride = num_rows + 1
+        self.__use_bitboards = self.__stride * num_cols <= 64
+        self.__windows = None if self.__use_bitboards else get_cell_windows(num_rows, num_cols)
+
+    def __check_winners(self, boards):
+        # the same shift-and-mask steps as Connect4State, on all the boards at once
+        won = np.zeros(len(boards), dtype=bool)
+        for shift in (1, self.__stride, self.__stride - 1, self.__stride + 1):
+            shift = np.uint64(shift)
+            pairs = boards & (boards >> shift)
+            won |= (pairs & (pairs >> (shift + shift))) != 0
+        return won
+
+    """
+    Plays a number of games between two policies
+    :param policies: the policy of the player in each position
+    :param num_games: the number of games
+    :param rng: the numpy random generator used by the policies
+    :return: the position of the winner of each game (-1 for a draw) and the number of turns of each game
+    """
+    def play(self, policies: list, num_games: int, rng):
+        num_rows, num_cols = self.__num_rows, self.__num_cols
+        num_cells = num_rows * num_cols
+
+        winners = np.full(num_games, -1)
+        lengths = np.full(num_games, num_cells)
+
+        # the games that are not finished yet. Finished games are removed from all the arrays
+        games = np.arange(num_games)
+        heights = np.zeros((num_games, num_cols), dtype=np.intp)
+        counts = np.zeros((2, num_games, num_cols), dtype=np.intp)
+        if self.__use_bitboards:
+            boards = np.zeros((2, num_games), dtype=np.uint64)
+        else:
+            # the cells are indexed by col * num_rows + height, with the sentinel cell at the end
+            cells = np.full((num_games, num_cells + 1), EMPTY_CELL, dtype=np.int8)
+            cells[:, num_cells] = SENTINEL
+
+        for turn in range(num_cells):
+            pos = turn % 2
+            cols = policies[pos].get_actions(heights, counts[pos], num_rows, rng)
+
+            # drop the checkers
+            indexes = np.arange(len(games))
+            played_heights = heights[indexes, cols]
+            heights[indexes, cols] += 1
+            counts[pos, indexes, cols] += 1
+            if self.__use_bitboards:
+                boards[pos] |= np.left_shift(np.uint64(1), (cols * self.__stride + played_heights).astype(np.uint64))
+                won = self.__check_winners(boards[pos])
+            else:
+                played = cols * num_rows + played_heights
+                cells[indexes, played] = pos
+                won = (cells[indexes[:, None, None], self.__windows[played]] == pos).all(axis=2).any(axis=1)
+
+            if not won.any():
+                continue
+
+            winners[games[won]] = pos
+            lengths[games[won]] = turn + 1
+            playing = ~won
+            games = games[playing]
+            heights = heights[playing]
+            counts = counts[:, playing]
+            if self.__use_bitboards:
+                boards = boards[:, playing]
+            else:
+                cells = cells[playing]
+            if len(games) == 0:
+                break
+
+        return winners, lengths
@@ -0,0 +1,13 @@
+from enum import Enum
+
+
+class Bound(Enum):
+    """
+    how a value stored in the transposition table relates to the real value of the position:
+        - EXACT: the value is the exact value of the position
+        - LOWER: the search failed high, the real value is the stored value or more
+        - UPPER: the search failed low, the real value is the stored value or less
+    """
+    EXACT = 0
+    LOWER = 1
+    UPPER = 2
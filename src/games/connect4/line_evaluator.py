@@ -0,0 +1,88 @@
+from games.connect4.action import Connect4Action
+from games.connect4.lines import get_lines
+from games.connect4.state import Connect4State
+
+
+class LineEvaluator:
+    """
+    Scores connect4 positions by the lines of 4 cells that each player can still complete: a line with only checkers
+    of one player is worth WEIGHTS[number of checkers] to that player, and a line with checkers of both players is
+    worth nothing. The number of checkers of each player in each line, and the score, are updated by each move and
+    undo, which only touch the lines through one cell (at most 13 on any board), so scoring a position costs nothing.
+    The moves must be the same ones played on the state that is searched
+    """
+
+    """
+    the value of a line by the number of checkers in it. A line with 4 checkers ends the game, so its value is never
+    used as a score
+    """
+    WEIGHTS = (0, 1, 3, 9, 27)
+
+    def __init__(self, state: Connect4State):
+        num_rows = state.get_num_rows()
+        lines = get_lines(num_rows, state.get_num_cols())
+        self.__num_rows = num_rows
+        self.__cell_lines = lines.cell_lines
+
+        """
+        the change of the score of a player when it adds a checker to a line, by its number of checkers in the line
+        and the number of checkers of the opponent: the value of its line grows, or the line of the opponent is blocked
+        """
+        weights = LineEvaluator.WEIGHTS
+        self.__gains = tuple(tuple(weights[own + 1] - weights[own] if other == 0 else weights[other] if own == 0 else 0
+                                   for other in range(4)) for own in range(4))
+
+        """
+        the number of checkers of each player in each line, and the score of player 0 (the score of player 1 is the
+        opposite). The checkers already on the board are counted from the bitboards
+        """
+        boards = state.get_bitboards()
+        self.__counts = [[bin(boards[player] & mask).count("1") for mask in lines.masks] for player in range(2)]
+        self.__score = 0
+        for own, other in zip(*self.__counts):
+            if other == 0:
+                self.__score += weights[own]
+            elif own == 0:
+                self.__score -= weights[other]
+
+        """
+        the height of each column, the player to move, and the columns that were played and the change of the score
+        of each move, so moves can be undone
+        """
+        self.__heights = [bin((boards[0] | boards[1]) & mask).count("1") for mask in lines.column_masks]
+        self.__acting_player = state.get_acting_player()
+        self.__moves = []
+
+    def update(self, action: Connect4Action):
+        col = action.get_col()
+        player = self.__acting_player
+        own_counts, other_counts = self.__counts[player], self.__counts[1 - player]
+
+        gain = 0
+        for line in self.__cell_lines[col * self.__num_rows + self.__heights[col]]:
+            # the cell is empty, so the line has at most 3 checkers
+            own = own_counts[line]
+            gain += self.__gains[own][other_counts[line]]
+            own_counts[line] = own + 1
+        if player == 1:
+            gain = -gain
+
+        self.__score += gain
+        self.__heights[col] += 1
+        self.__moves.append((col, gain))
+        self.__acting_player = 1 - player
+
+    def undo(self):
+        col, gain = self.__moves.pop()
+        self.__acting_player = player = 1 - self.__acting_player
+        self.__heights[col] -= 1
+        own_counts = self.__counts[player]
+        for line in self.__cell_lines[col * self.__num_rows + self.__heights[col]]:
+            own_counts[line] -= 1
+        self.__score -= gain
+
+    """
+    Gets the score of the position for a player
+    """
+    def get_score(self, pos: int) -> int:
+        return self.__score if pos == 0 else -self.__score
@@ -0,0 +1,54 @@
+from functools import lru_cache
+
+
+class Connect4Lines:
+    """
+    The lines of 4 cells where a player can win, on a board size (69 lines on the 6x7 board). Cells are indexed as
+    col * num_rows + height, the same as the Zobrist keys, with the height counted from the bottom of the column
+    """
+
+    def __init__(self, num_rows: int, num_cols: int):
+        self.num_rows = num_rows
+        self.num_cols = num_cols
+
+        """
+        the cells of each line: horizontal lines first, then vertical ones, then both diagonals
+        """
+        lines = []
+        for d_col, d_height in ((1, 0), (0, 1), (1, 1), (1, -1)):
+            for col in range(num_cols):
+                for height in range(num_rows):
+                    end_col, end_height = col + 3 * d_col, height + 3 * d_height
+                    if 0 <= end_col < num_cols and 0 <= end_height < num_rows:
+                        lines.append(tuple((col + i * d_col) * num_rows + height + i * d_height for i in range(4)))
+        self.lines = tuple(lines)
+
+        """
+        the lines that go through each cell (cell-to-line incidence)
+        """
+        cell_lines = [[] for _cell in range(num_rows * num_cols)]
+        for index, line in enumerate(self.lines):
+            for cell in line:
+                cell_lines[cell].append(index)
+        self.cell_lines = tuple(tuple(indexes) for indexes in cell_lines)
+
+        """
+        the cells of each line and of each column as bitboards, with the layout of Connect4State (num_rows + 1 bits per
+        column), so the checkers of a player in a line or a column are found with a single and
+        """
+        stride = num_rows + 1
+        self.masks = tuple(sum(1 << (cell // num_rows * stride + cell % num_rows) for cell in line)
+                           for line in self.lines)
+        self.column_masks = tuple(((1 << num_rows) - 1) << (col * stride) for col in range(num_cols))
+
+    def __len__(self):
+        return len(self.lines)
+
+
+"""
+Gets the lines of a board size. They are computed once per process and board size, and shared by everyone that uses
+them
+"""
+@lru_cache(maxsize=None)
+def get_lines(num_rows: int, num_cols: int) -> Connect4Lines:
+    return Connect4Lines(num_rows, num_cols)
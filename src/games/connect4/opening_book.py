@@ -0,0 +1,112 @@
+import mmap
+import os
+import struct
+from functools import lru_cache
+from typing import Optional
+
+from games.connect4.action import Connect4Action
+from games.connect4.state import Connect4State
+
+"""
+the opening book the minimax player uses by default
+"""
+DEFAULT_BOOK_PATH = os.path.join(os.path.dirname(os.path.abspath(__file__)), "opening_book.bin")
+
+"""
+the header of a book file: a magic string, the number of rows and cols of the board, and the number of entries
+"""
+HEADER = struct.Struct("<4sHHI")
+MAGIC = b"C4OB"
+
+"""
+each entry is the hash of a position (the smallest of its hash and mirror hash) and the column to play in the
+orientation of that hash. The entries are sorted by hash, so a position is found with a binary search
+"""
+ENTRY = struct.Struct("<QB")
+
+
+class OpeningBook:
+    """
+    Reads an opening book file. The file is memory-mapped, so the processes that load the same book share a single copy
+    of it, and only the pages that are searched are read from disk
+    """
+    def __init__(self, path: str):
+        with open(path, "rb") as file:
+            self.__data = mmap.mmap(file.fileno(), 0, access=mmap.ACCESS_READ)
+
+        magic, self.__num_rows, self.__num_cols, self.__num_entries = HEADER.unpack_from(self.__data, 0)
+        if magic != MAGIC or HEADER.size + self.__num_entries * ENTRY.size != len(self.__data):
+            raise Exception(f"{path} is not a valid connect4 opening book")
+
+    def get_num_rows(self):
+        return self.__num_rows
+
+    def get_num_cols(self):
+        return self.__num_cols
+
+    def __len__(self):
+        return self.__num_entries
+
+    def __find(self, key: int) -> Optional[int]:
+        low, high = 0, self.__num_entries
+        while low < high:
+            middle = (low + high) // 2
+            entry_key, col = ENTRY.unpack_from(self.__data, HEADER.size + middle * ENTRY.size)
+            if entry_key == key:
+                return col
+            if entry_key < key:
+                low = middle + 1
+            else:
+                high = middle
+        return None
+
+    """
+    Gets the book move of a position, or None if the position is not in the book
+    """
+    def get_action(self, state: Connect4State) -> Optional[Connect4Action]:
+        if state.get_num_rows() != self.__num_rows or state.get_num_cols() != self.__num_cols:
+            return None
+
+        key, mirrored = get_book_key(state)
+        col = self.__find(key)
+        if col is None:
+            return None
+        return Connect4Action(self.__num_cols - 1 - col if mirrored else col)
+
+    def close(self):
+        self.__data.close()
+
+
+"""
+Gets the key of a position in the book, and whether the key is the hash of its mirror image. A position and its mirror
+image share the same entry
+"""
+def get_book_key(state: Connect4State):
+    state_hash = state.get_hash()
+    mirror_hash = state.get_mirror_hash()
+    if mirror_hash < state_hash:
+        return mirror_hash, True
+    return state_hash, False
+
+
+"""
+Writes an opening book file
+:param entries: a dict with the key of each position and the column to play, in the orientation of the key
+"""
+def write_book(path: str, num_rows: int, num_cols: int, entries: dict):
+    temp_path = f"{path}.tmp"
+    with open(temp_path, "wb") as file:
+        file.write(HEADER.pack(MAGIC, num_rows, num_cols, len(entries)))
+        for key in sorted(entries):
+            file.write(ENTRY.pack(key, entries[key]))
+    os.replace(temp_path, path)
+
+
+"""
+Loads an opening book once per process, or returns None if the file doesn't exist
+"""
+@lru_cache(maxsize=None)
+def load_book(path: str) -> Optional[OpeningBook]:
+    if not os.path.exists(path):
+        return None
+    return OpeningBook(path)
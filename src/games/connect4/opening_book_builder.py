@@ -0,0 +1,93 @@
+import argparse
+from concurrent.futures import ProcessPoolExecutor
+
+from tqdm import tqdm
+
+from games.connect4.action import Connect4Action
+from games.connect4.opening_book import get_book_key, write_book
+from games.connect4.players.minimax import MinimaxConnect4Player
+from games.connect4.state import Connect4State
+
+
+"""
+Gets the positions of the first plies of the game that are not finished, as the moves that lead to them, with a single
+position for each pair of mirror images
+:param num_plies: positions with up to num_plies - 1 checkers are included
+"""
+def get_opening_positions(num_rows: int, num_cols: int, num_plies: int) -> dict:
+    positions = {}
+    frontier = [[]]
+    for _ply in range(num_plies):
+        next_frontier = []
+        for moves in frontier:
+            state = build_state(num_rows, num_cols, moves)
+            key, _mirrored = get_book_key(state)
+            if state.is_finished() or key in positions:
+                continue
+            positions[key] = moves
+            next_frontier.extend(moves + [action.get_col()] for action in state.get_possible_actions())
+        frontier = next_frontier
+    return positions
+
+
+def build_state(num_rows, num_cols, moves):
+    state = Connect4State(num_rows, num_cols)
+    for col in moves:
+        state.update(Connect4Action(col))
+    return state
+
+
+"""
+Searches the best move of a position, for the player that is to move. Returns the key of the position in the book and
+the move in the orientation of the key
+"""
+def search_position(num_rows: int, num_cols: int, moves: list, depth: int):
+    state = build_state(num_rows, num_cols, moves)
+    player = MinimaxConnect4Player("Book", depth, opening_book=None)
+    player.set_current_pos(state.get_acting_player())
+    col = player.get_action(state).get_col()
+
+    key, mirrored = get_book_key(state)
+    return key, num_cols - 1 - col if mirrored else col
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Build an opening book for the connect4 minimax player.')
+
+    parser.add_argument('--output', required=True,
+                        help='File where the opening book is written.')
+
+    parser.add_argument('--num-plies', type=int, default=6,
+                        help='The book has the positions with less than this number of checkers. Defaults to 6.')
+
+    parser.add_argument('--depth', type=int, default=8,
+                        help='Search depth of each position of the book. Defaults to 8.')
+
+    parser.add_argument('--num-rows', type=int, default=6,
+                        help='Number of rows of the board. Defaults to 6.')
+
+    parser.add_argument('--num-cols', type=int, default=7,
+                        help='Number of cols of the board. Defaults to 7.')
+
+    parser.add_argument('--workers', type=int, default=1,
+                        help='Number of processes that search the positions. Defaults to 1.')
+
+    args = parser.parse_args()
+
+    positions = get_opening_positions(args.num_rows, args.num_cols, args.num_plies)
+    print(f"Searching {len(positions)} positions at depth {args.depth}...")
+
+    entries = {}
+    with ProcessPoolExecutor(max_workers=args.workers) as executor:
+        futures = [executor.submit(search_position, args.num_rows, args.num_cols, moves, args.depth)
+                   for moves in positions.values()]
+        for future in tqdm(futures):
+            key, col = future.result()
+            entries[key] = col
+
+    write_book(args.output, args.num_rows, args.num_cols, entries)
+    print(f"Opening book with {len(entries)} positions written to {args.output}")
+
+
+if __name__ == "__main__":
+    main()
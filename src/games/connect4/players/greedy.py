@@ -1,5 +1,6 @@
 from random import choice
 from games.connect4.action import Connect4Action
+from games.connect4.lines import get_lines
 from games.connect4.player import Connect4Player
 from games.connect4.state import Connect4State
 from games.state import State
@@ -11,7 +12,8 @@ class GreedyConnect4Player(Connect4Player):
         super().__init__(name)
 
     def get_action(self, state: Connect4State):
-        grid = state.get_grid()
+        board = state.get_bitboards()[self.get_current_pos()]
+        column_masks = get_lines(state.get_num_rows(), state.get_num_cols()).column_masks
 
         selected_col = None
         max_count = 0
@@ -20,10 +22,7 @@ class GreedyConnect4Player(Connect4Player):
             if not state.validate_action(Connect4Action(col)):
                 continue
 
-            count = 0
-            for row in range(0, state.get_num_rows()):
-                if grid[row][col] == self.get_current_pos():
-                    count += 1
+            count = bin(board & column_masks[col]).count("1")
 
             # it swap the column if we exceed the count. if the count of chips is the same, we swap 50% of the times
             if selected_col is None or count > max_count or (count == max_count and choice([False, True])):
@@ -35,6 +34,10 @@ class GreedyConnect4Player(Connect4Player):
 
         return Connect4Action(selected_col)
 
+    def get_consumed_events(self):
+        # this player ignores all the game events
+        return set()
+
     def event_action(self, pos: int, action, new_state: State):
         # ignore
         pass
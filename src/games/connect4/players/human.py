@@ -4,6 +4,7 @@ from games.connect4.action import Connect4Action
 from games.connect4.player import Connect4Player
 from games.connect4.result import Connect4Result
 from games.connect4.state import Connect4State
+from games.player_event import PlayerEvent
 
 
 class HumanConnect4Player(Connect4Player):
@@ -27,6 +28,10 @@ class HumanConnect4Player(Connect4Player):
             except Exception:
                 continue
 
+    def get_consumed_events(self):
+        # the board is only displayed at the end of the game, with the result of the player
+        return {PlayerEvent.RESULT, PlayerEvent.END_GAME}
+
     def event_action(self, pos: int, action, new_state: Connect4State):
         # ignore
         pass
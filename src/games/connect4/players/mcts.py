@@ -0,0 +1,193 @@
+import math
+import random
+import time
+from concurrent.futures import ProcessPoolExecutor
+from typing import Optional
+
+from games.connect4.action import Connect4Action
+from games.connect4.player import Connect4Player
+from games.connect4.result import Connect4Result
+from games.connect4.state import Connect4State
+from games.player_event import PlayerEvent
+from games.state import State
+
+
+class MCTSNode:
+    """
+    A node of the search tree, for the position after a move
+    """
+
+    def __init__(self, state: Connect4State, player: Optional[int]):
+        """
+        the player that made the move into this node (None for the root of a new game), and the number of times the
+        node was visited and the sum of the scores of that player in those visits (1 for a win, 0.5 for a draw)
+        """
+        self.player = player
+        self.visits = 0
+        self.score = 0.0
+
+        """
+        the children of the node by column, and the columns that were not expanded yet
+        """
+        self.children = {}
+        self.untried = [] if state.is_finished() else [action.get_col() for action in state.get_possible_actions()]
+
+    def get_uct_child(self, exploration: float):
+        log_visits = math.log(self.visits)
+        return max(self.children.items(),
+                   key=lambda item: item[1].score / item[1].visits + exploration * math.sqrt(log_visits / item[1].visits))
+
+
+"""
+Runs a search on a new tree and returns the number of visits and the score of each move of the root. Used by the
+worker processes of the root parallelization, so it must be defined at the module level
+"""
+def search_root(state: Connect4State, num_playouts: Optional[int], time_limit: Optional[float], exploration: float,
+                seed: int):
+    random.seed(seed)
+    root = MCTSNode(state, None)
+    run_playouts(root, state, num_playouts, time_limit, exploration)
+    return {col: (child.visits, child.score) for col, child in root.children.items()}, root.visits
+
+
+"""
+Grows a tree with playouts from a state, until the number of playouts or the time limit is reached. The state is
+changed during the search, but restored before returning
+:return: the number of playouts
+"""
+def run_playouts(root: MCTSNode, state: Connect4State, num_playouts: Optional[int], time_limit: Optional[float],
+                 exploration: float) -> int:
+    deadline = None if time_limit is None else time.perf_counter() + time_limit
+    count = 0
+    while (num_playouts is None or count < num_playouts) and (deadline is None or time.perf_counter() < deadline):
+        playout(root, state, exploration)
+        count += 1
+    return count
+
+
+# one iteration of selection, expansion, random playout and backpropagation
+def playout(root: MCTSNode, state: Connect4State, exploration: float):
+    path = [root]
+    num_moves = 0
+
+    # selection: go down the fully expanded nodes
+    node = root
+    while not node.untried and node.children:
+        col, node = node.get_uct_child(exploration)
+        state.update(Connect4Action(col))
+        num_moves += 1
+        path.append(node)
+
+    # expansion: add one of the moves that were not tried yet
+    if node.untried:
+        col = node.untried.pop(random.randrange(len(node.untried)))
+        player = state.get_acting_player()
+        state.update(Connect4Action(col))
+        num_moves += 1
+        node.children[col] = node = MCTSNode(state, player)
+        path.append(node)
+
+    # playout: random moves until the end of the game
+    while not state.is_finished():
+        state.update(random.choice(state.get_possible_actions()))
+        num_moves += 1
+
+    # backpropagation: each node is scored for the player that moved into it
+    results = [state.get_result(0), state.get_result(1)]
+    for node in path:
+        node.visits += 1
+        if node.player is not None:
+            node.score += (results[node.player] - Connect4Result.LOOSE.value) / 2
+
+    for _move in range(num_moves):
+        state.undo()
+
+
+class MCTSConnect4Player(Connect4Player):
+    """
+    :param num_playouts: the number of playouts of each move, in each tree. If None, only the time limit applies
+    :param time_limit: the time budget of each move, in seconds. If None, only the number of playouts applies
+    :param workers: the number of trees searched in parallel (root parallelization). One of them is searched in this
+    process, and is kept between moves. The visits of the moves of all the trees are added up to choose the move
+    :param exploration: the exploration constant of UCT
+    """
+    def __init__(self, name, num_playouts: Optional[int] = 1000, time_limit: Optional[float] = None, workers: int = 1,
+                 exploration: float = math.sqrt(2)):
+        super().__init__(name)
+
+        if num_playouts is None and time_limit is None:
+            raise Exception("the number of playouts or the time limit must be set")
+
+        self.num_playouts = num_playouts
+        self.time_limit = time_limit
+        self.workers = workers
+        self.exploration = exploration
+
+        """
+        the root of the search tree, for the current position of the game, and the hash and number of checkers of that
+        position, to find out if the tree still matches the game
+        """
+        self.__root = None
+        self.__root_key = None
+
+        """
+        the processes that search the other trees, started on the first move
+        """
+        self.__executor = None
+
+        """
+        number of playouts in all the trees, since the player was created
+        """
+        self.__total_playouts = 0
+
+    def get_total_playouts(self):
+        return self.__total_playouts
+
+    def get_action(self, state: Connect4State):
+        board = state.clone()
+        key = (board.get_hash(), board.get_num_checkers())
+        if self.__root is None or self.__root_key != key:
+            self.__root = MCTSNode(board, None)
+            self.__root_key = key
+
+        # the other trees are searched while this process searches its own
+        futures = []
+        if self.workers > 1:
+            if self.__executor is None:
+                self.__executor = ProcessPoolExecutor(max_workers=self.workers - 1)
+            # each worker gets its own copy, as the arguments are sent in the background while this process changes
+            # the board with its playouts
+            futures = [self.__executor.submit(search_root, board.clone(), self.num_playouts, self.time_limit,
+                                              self.exploration, random.getrandbits(64))
+                       for _worker in range(self.workers - 1)]
+
+        self.__total_playouts += run_playouts(self.__root, board, self.num_playouts, self.time_limit, self.exploration)
+
+        visits = {col: child.visits for col, child in self.__root.children.items()}
+        for future in futures:
+            children, num_playouts = future.result()
+            self.__total_playouts += num_playouts
+            for col, (child_visits, _score) in children.items():
+                visits[col] = visits.get(col, 0) + child_visits
+
+        return Connect4Action(max(visits, key=visits.get))
+
+    def get_consumed_events(self):
+        # the tree follows the moves of the game, so it can be reused on the next move
+        return {PlayerEvent.ACTION}
+
+    def event_action(self, pos: int, action, new_state: State):
+        if self.__root is None:
+            return
+        self.__root = self.__root.children.get(action.get_col())
+        self.__root_key = (new_state.get_hash(), new_state.get_num_checkers())
+
+    def event_end_game(self, final_state: State):
+        # ignore
+        pass
+
+    # the worker processes are not sent when the player is pickled
+    def __getstate__(self):
+        state = self.__dict__.copy()
+        state['_MCTSConnect4Player__executor'] = None
+        return state
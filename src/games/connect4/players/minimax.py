@@ -1,111 +1,509 @@
 from games.connect4.player import Connect4Player
 from games.connect4.action import Connect4Action
+from games.connect4.bound import Bound
+from games.connect4.heuristic import evaluate_position
+from games.connect4.line_evaluator import LineEvaluator
+from games.connect4.opening_book import DEFAULT_BOOK_PATH, load_book
+from games.connect4.result import Connect4Result
 from games.connect4.state import Connect4State
+from games.connect4.transposition_table import TranspositionTable, get_shared_table
 from games.state import State
+try:
+    from games.connect4.vectorized_heuristic import evaluate_grids
+except ImportError:
+    # numpy is optional, without it the leaves are scored one at a time in Python
+    evaluate_grids = None
 import math
+import time
+from concurrent.futures import ProcessPoolExecutor
+from typing import Optional
+
+class SearchTimeout(Exception):
+    # raised inside the search when the time budget of the move is spent
+    pass
+
+
+"""
+the player of a worker process of the parallel search. It is created once per process by init_search_worker and kept
+for all the tasks the process runs, so they share its transposition table and its move ordering
+"""
+search_worker = None
+
+
+def init_search_worker(settings: dict):
+    global search_worker
+    search_worker = MinimaxConnect4Player("Worker", opening_book=None, **settings)
+
+
+"""
+Searches the position after some moves at one depth, for the parallel search. Runs in the worker processes, so it must
+be defined at the module level
+:return: the value of the position, or None if the deadline was reached, and the number of nodes of the search
+"""
+def search_split_in_worker(pos: int, state: Connect4State, actions: list, depth: int, alpha, beta,
+                           deadline: Optional[float]):
+    num_nodes = search_worker.get_num_nodes()
+    search_worker.set_current_pos(pos)
+    value = search_worker.search_split(state, actions, depth, alpha, beta, deadline)
+    return value, search_worker.get_num_nodes() - num_nodes
+
 
 class MinimaxConnect4Player(Connect4Player):
-    def __init__(self, name, depth=5):
+    """
+    the value of a won position. It is larger than any value of the heuristic, so a forced win is always preferred
+    """
+    WIN_SCORE = 1000
+
+    """
+    :param depth: the maximum search depth
+    :param time_limit: the time budget of each move, in seconds. The search deepens one level at a time and returns
+    the result of the deepest search that was completed in time. If None, the search always goes to the maximum depth
+    :param max_table_bytes: the size of the transposition table, in bytes. The players of a process that use the same
+    evaluation on the same board share a single table, which is only allocated when it is first used
+    :param incremental: if True, the positions are scored by the lines of 4 cells that each player can still complete,
+    with counts that are updated by each move of the search (see LineEvaluator). If False, the original heuristic
+    scores each leaf from the bitboards (see evaluate_position)
+    :param vectorized: if True and numpy is installed, the original heuristic scores all the leaves below each node in
+    a single batch with numpy. The scores are the same either way, but the batch can't be pruned, so it is slower than
+    scoring the leaves one at a time from the bitboards. Not used by the incremental evaluation
+    :param opening_book: the opening book file, whose moves are played without searching. Nothing is used if it is None
+    or the file doesn't exist
+    :param workers: the number of processes of the search. With more than 1, the search deepens one level at a time
+    and each level is split between the processes below the root, into one task per move and reply: the first reply
+    to the first move is searched alone, then its other replies in parallel, bounded by its value, for the exact value
+    of the move. The other moves are then searched in parallel with that value as a bound, first with their best
+    reply, so most of them are proven worse by a single task. Each process keeps its transposition table and its move
+    ordering between tasks, and each move and reply is always searched by the same process, so without a time limit
+    the moves only depend on the number of workers
+    """
+    def __init__(self, name, depth=5, time_limit: Optional[float] = None,
+                 max_table_bytes: int = TranspositionTable.DEFAULT_MAX_BYTES, incremental: bool = True,
+                 vectorized: bool = False, opening_book: Optional[str] = DEFAULT_BOOK_PATH, workers: int = 1):
         super().__init__(name)
         self.depth = depth
-        self.transposition_table = {}
+        self.time_limit = time_limit
+        self.incremental = incremental
+        self.vectorized = vectorized and evaluate_grids is not None
+        self.opening_book_path = opening_book
+        self.opening_book = None if opening_book is None else load_book(opening_book)
+        self.workers = workers
+        self.max_table_bytes = max_table_bytes
 
-    def get_action(self, state: Connect4State):
-        best_score = -math.inf
-        best_action = None
+        """
+        the processes of the parallel search, started on the first move, each with its own executor so the tasks are
+        always sent to the same process
+        """
+        self.__executors = None
+
+        """
+        the position and depth of the last task of a parallel search run by this player, in a worker process. The
+        tasks of the same search share its move ordering
+        """
+        self.__split_search = None
+
+        """
+        the transposition table of the current search. It is the table of the process for the evaluation and the board
+        size, so it is kept across searches and games, and it is not copied when the player is pickled
+        """
+        self.transposition_table = None
+
+        """
+        move ordering of the current search: the last two moves that caused a cutoff at each ply (killer moves), and
+        how often each column caused a cutoff for each side (history heuristic)
+        """
+        self.__killers = []
+        self.__history = [[], []]
+
+        """
+        the time at which the current search must stop, or None if it has no time limit
+        """
+        self.__deadline = None
+        self.__ply = 0
+
+        """
+        the incremental evaluation of the current search, which follows the moves played on the searched state
+        """
+        self.__lines = None
+
+        """
+        number of nodes visited by the search, since the player was created
+        """
+        self.__num_nodes = 0
+
+        """
+        the depth of the last completed iteration of the last search
+        """
+        self.__completed_depth = 0
 
+    def get_num_nodes(self):
+        return self.__num_nodes
+
+    def get_completed_depth(self):
+        return self.__completed_depth
+
+    def get_action(self, state: Connect4State):
         possible_actions = state.get_possible_actions()
-        ordered_actions = sorted(possible_actions, key=lambda action: abs(action.get_col() - state.get_num_cols() // 2))
+        self.__completed_depth = 0
+        if len(possible_actions) == 1:
+            return possible_actions[0]
 
-        for depth in range(1, self.depth + 1):
-            for action in ordered_actions:
-                value = self.minimax(state, depth, -math.inf, math.inf, True, action)
-                if value > best_score:
-                    best_score = value
-                    best_action = action
+        if self.opening_book is not None:
+            book_action = self.opening_book.get_action(state)
+            if book_action is not None:
+                return book_action
+
+        # win right away if possible, otherwise block the only move that makes the opponent win right away
+        for action in possible_actions:
+            if state.is_winning_action(action):
+                return action
+        opponent = 1 - state.get_acting_player()
+        for action in possible_actions:
+            if state.is_winning_action(action, opponent):
+                return action
+
+        # the search plays and undoes moves on a single copy of the state
+        board = state.clone()
+        deadline = None if self.time_limit is None else time.monotonic() + self.time_limit
+
+        num_cols = board.get_num_cols()
+        ordered_actions = sorted(possible_actions, key=lambda action: abs(action.get_col() - num_cols // 2))
+        best_action = ordered_actions[0]
+
+        # no need to search deeper than the number of moves left in the game
+        max_depth = min(self.depth, board.get_num_rows() * num_cols - state.get_num_checkers() - 1)
+        if self.workers > 1:
+            return self.__get_parallel_action(board, ordered_actions, max_depth, deadline)
+
+        self.__start_search(board, deadline)
+        for depth in range(0, max_depth + 1):
+            try:
+                best_action, values = self.__search_root(board, depth, ordered_actions)
+            except SearchTimeout:
+                break
+            self.__completed_depth = depth
+            ordered_actions = self.__reorder_actions(ordered_actions, best_action, values)
+
+        return best_action
+
+    def __reorder_actions(self, ordered_actions, best_action, values):
+        # the next iteration starts with the best moves of this one, the principal variation first
+        ordered_actions = sorted(ordered_actions, key=lambda action: -values[action.get_col()])
+        ordered_actions.remove(best_action)
+        ordered_actions.insert(0, best_action)
+        return ordered_actions
+
+    def __start_search(self, board: Connect4State, deadline: Optional[float]):
+        # the values of different evaluations, or of different board sizes, are never stored in the same table
+        evaluation = "incremental" if self.incremental else "heuristic"
+        self.transposition_table = get_shared_table(
+            f"minimax-{evaluation}-{board.get_num_rows()}x{board.get_num_cols()}", self.max_table_bytes)
+        self.transposition_table.new_search()
+        self.__killers = [[None, None] for _ply in range(self.depth + 2)]
+        self.__history = [[0] * board.get_num_cols(), [0] * board.get_num_cols()]
+        self.__set_board(board, deadline)
+
+    def __set_board(self, board: Connect4State, deadline: Optional[float]):
+        self.__deadline = deadline
+        self.__lines = LineEvaluator(board) if self.incremental else None
+
+    def __get_parallel_action(self, board: Connect4State, ordered_actions, max_depth, deadline):
+        if self.__executors is None:
+            settings = {"depth": self.depth, "max_table_bytes": self.max_table_bytes,
+                        "incremental": self.incremental, "vectorized": self.vectorized}
+            self.__executors = [ProcessPoolExecutor(max_workers=1, initializer=init_search_worker, initargs=(settings,))
+                                for _worker in range(self.workers)]
+
+        # the first two levels are too small to be split, so they are searched here, without a deadline, and there is
+        # always a searched move to play
+        self.__start_search(board, None)
+        for depth in range(0, min(1, max_depth) + 1):
+            best_action, values = self.__search_root(board, depth, ordered_actions)
+            self.__completed_depth = depth
+            ordered_actions = self.__reorder_actions(ordered_actions, best_action, values)
+
+        # all the moves are deepened together, so the moves are only compared at depths that were completed for every
+        # one of them. The values of the replies at one depth order the replies at the next one
+        reply_values = {}
+        for depth in range(2, max_depth + 1):
+            result = self.__search_parallel_depth(board, ordered_actions, depth, deadline, reply_values)
+            if result is None:
+                break
+            best_action, values, reply_values = result
+            self.__completed_depth = depth
+            ordered_actions = self.__reorder_actions(ordered_actions, best_action, values)
 
         return best_action
 
+    """
+    Searches the moves at one depth with the worker processes, with a task for each move and reply
+    :param reply_values: the values of the tasks of the previous depth, by the columns of their move and reply
+    :return: the best move, the value of each move and the values of the tasks, or None if the deadline was reached
+    before the end
+    """
+    def __search_parallel_depth(self, board: Connect4State, ordered_actions, depth, deadline, reply_values: dict):
+        # each move and reply is always sent to the same process, which has the entries of its previous depths in its
+        # transposition table, and each process runs its tasks in the order they are submitted, so the results are the
+        # same in every run. The arguments are sent in the background, so the tasks get a copy of the board that is
+        # never changed
+        root = board.clone()
+        num_cols = root.get_num_cols()
+
+        def submit(action, reply, alpha, beta):
+            task = action.get_col() * num_cols + (0 if reply is None else reply.get_col())
+            actions = [action] if reply is None else [action, reply]
+            return self.__executors[task % len(self.__executors)].submit(
+                search_split_in_worker, self.get_current_pos(), root, actions, depth, alpha, beta, deadline)
+
+        def get_value(future):
+            value, num_nodes = future.result()
+            self.__num_nodes += num_nodes
+            return value
+
+        # the replies that were the best for the opponent at the previous depth go first, then the central columns.
+        # A move that ends the game has a single task, without a reply
+        center = root.get_num_cols() // 2
+        replies = {}
+        for action in ordered_actions:
+            col = action.get_col()
+            root.update(action)
+            replies[col] = [None] if root.is_finished() else sorted(
+                root.get_possible_actions(),
+                key=lambda reply: (reply_values.get((col, reply.get_col()), math.inf), abs(reply.get_col() - center)))
+            root.undo()
+
+        # the value of a move is the lowest value of its replies. The tasks are all submitted before any of them is
+        # waited for, so each batch runs in parallel. Returns False if the deadline was reached
+        values = {}
+        new_reply_values = {}
+
+        def run(tasks):
+            futures = [submit(action, reply, alpha, beta) for action, reply, alpha, beta in tasks]
+            for (action, reply, _alpha, _beta), future in zip(tasks, futures):
+                value = get_value(future)
+                if value is None:
+                    return False
+                new_reply_values[(action.get_col(), None if reply is None else reply.get_col())] = value
+                values[action.get_col()] = min(values.get(action.get_col(), math.inf), value)
+            return True
+
+        # the replies of the first move are searched for its exact value. The replies that are not lower than the first
+        # one don't change the value of the move, so their searches stop as soon as they are proven higher
+        best_action = ordered_actions[0]
+        first_replies = replies[best_action.get_col()]
+        if not run([(best_action, first_replies[0], -math.inf, math.inf)]):
+            return None
+        if not run([(best_action, reply, -math.inf, values[best_action.get_col()]) for reply in first_replies[1:]]):
+            return None
+        best_value = values[best_action.get_col()]
+
+        # the other moves only have to be better than the first one, so their searches fail low as soon as they are
+        # proven worse. The best reply of each move is searched first, as it is often enough to prove it, and only the
+        # moves it didn't refute search their other replies, bounded by the value of the best reply like the first
+        # move. The bounds don't depend on the order the tasks finish in, so neither do the results
+        others = ordered_actions[1:]
+        if not run([(action, replies[action.get_col()][0], best_value, math.inf) for action in others]):
+            return None
+        if not run([(action, reply, best_value, values[action.get_col()]) for action in others
+                    if values[action.get_col()] > best_value for reply in replies[action.get_col()][1:]]):
+            return None
+
+        # the first move keeps the ties, as in the serial search
+        for action in others:
+            if values[action.get_col()] > values[best_action.get_col()]:
+                best_action = action
+        return best_action, values, new_reply_values
+
+    """
+    Searches the position after some moves at one depth, as part of a parallel search. The state is the position
+    before the moves, and the depth is counted like the depth of the whole search, from the first move. The tasks of
+    the same position and depth continue the same search, so they share its move ordering
+    :param alpha: the lower bound of the search window
+    :param beta: the upper bound of the search window
+    :return: the value of the position, or None if the deadline was reached before the end of the search
+    """
+    def search_split(self, state: Connect4State, actions: list, depth: int, alpha, beta, deadline: Optional[float]):
+        board = state.clone()
+        for action in actions[:-1]:
+            board.update(action)
+
+        search = (state.get_hash(), state.get_num_checkers(), self.get_current_pos(), depth)
+        if search != self.__split_search:
+            self.__split_search = search
+            self.__start_search(board, deadline)
+        else:
+            self.__set_board(board, deadline)
+
+        self.__ply = len(actions) - 1
+        try:
+            # after a move of this player, the opponent is the one choosing, so the next level minimizes
+            return self.minimax(board, depth - len(actions) + 1, alpha, beta, len(actions) % 2 == 0, actions[-1])
+        except SearchTimeout:
+            return None
+
+    def __search_root(self, board: Connect4State, depth, ordered_actions):
+        best_action = None
+        alpha = -math.inf
+        values = {}
+        self.__ply = 0
+        for action in ordered_actions:
+            # after this player moves, the opponent is the one choosing, so the next level minimizes
+            value = self.minimax(board, depth, alpha, math.inf, False, action)
+            values[action.get_col()] = value
+            if value > alpha:
+                alpha = value
+                best_action = action
+        return best_action, values
+
+    def __get_key(self, state: Connect4State):
+        # a position and its mirror image have the same game value, so both are stored under the smallest of their
+        # hashes. The heuristic only scans some directions from each cell and is not exactly symmetric, so a mirrored
+        # position reuses the value of the orientation that was searched. The values are from the point of view of
+        # this player, so its seat is part of the key
+        state_hash = state.get_hash()
+        mirror_hash = state.get_mirror_hash()
+        mirrored = mirror_hash < state_hash
+        return ((mirror_hash if mirrored else state_hash) << 1) | self.get_current_pos(), mirrored
+
+    def __order_actions(self, state: Connect4State, best_col, side):
+        # the best move stored in the transposition table goes first, then the killer moves of this ply, then the
+        # moves by history score, and the central columns break ties
+        killers = self.__killers[self.__ply]
+        history = self.__history[side]
+        center = state.get_num_cols() // 2
+
+        def priority(action):
+            col = action.get_col()
+            if col == best_col:
+                return -math.inf, 0
+            if col == killers[0] or col == killers[1]:
+                return -math.inf, 1
+            return -history[col], abs(col - center)
+
+        actions = state.get_possible_actions()
+        actions.sort(key=priority)
+        return actions
+
+    def __record_cutoff(self, col, side, depth):
+        killers = self.__killers[self.__ply]
+        if killers[0] != col:
+            killers[1] = killers[0]
+            killers[0] = col
+        self.__history[side][col] += depth * depth
+
+    def __play(self, state: Connect4State, action):
+        state.update(action)
+        if self.__lines is not None:
+            self.__lines.update(action)
+
+    def __unplay(self, state: Connect4State):
+        state.undo()
+        if self.__lines is not None:
+            self.__lines.undo()
+
+    def __evaluate(self, state: Connect4State):
+        result = state.get_result(self.get_current_pos())
+        if result is None:
+            if self.incremental:
+                # the score of a large board could reach the value of a win
+                score = self.__lines.get_score(self.get_current_pos())
+                return max(-MinimaxConnect4Player.WIN_SCORE + 1, min(MinimaxConnect4Player.WIN_SCORE - 1, score))
+            return evaluate_position(state, self.get_current_pos())
+        return result * MinimaxConnect4Player.WIN_SCORE if result != Connect4Result.DRAW.value else 0
+
+    def __search_leaves(self, state: Connect4State, maximizing_player):
+        # all the children are leaves: the finished ones get their final score, and the others are scored together.
+        # Scoring all of them in one call is cheaper than what alpha-beta could prune among them
+        actions = state.get_possible_actions()
+        values = [None] * len(actions)
+        grids = []
+        for index, action in enumerate(actions):
+            self.__num_nodes += 1
+            self.__play(state, action)
+            if state.is_finished():
+                values[index] = self.__evaluate(state)
+            else:
+                grids.append([row.copy() for row in state.get_grid()])
+            self.__unplay(state)
+
+        if grids:
+            scores = iter(evaluate_grids(grids, self.get_current_pos()).tolist())
+            values = [next(scores) if value is None else value for value in values]
+
+        best_index = values.index(max(values) if maximizing_player else min(values))
+        return values[best_index], actions[best_index]
+
     def minimax(self, state, depth, alpha, beta, maximizing_player, action):
-        state_key = str(state.get_grid()) + str(maximizing_player)
-        if state_key in self.transposition_table and self.transposition_table[state_key][0] >= depth:
-            return self.transposition_table[state_key][1]
+        self.__num_nodes += 1
+        if self.__deadline is not None and time.monotonic() > self.__deadline:
+            raise SearchTimeout()
+
+        self.__play(state, action)
 
-        cloned_state = state.clone()
-        cloned_state.update(action)
+        if depth == 0 or state.is_finished():
+            value = self.__evaluate(state)
+            self.__unplay(state)
+            return value
 
-        if depth == 0 or cloned_state.is_finished():
-            return self.__heuristic(cloned_state)
+        key, mirrored = self.__get_key(state)
+        entry = self.transposition_table.get(key)
+        best_col = None
+        if entry is not None:
+            if entry.depth >= depth:
+                if entry.bound == Bound.EXACT \
+                        or (entry.bound == Bound.LOWER and entry.value >= beta) \
+                        or (entry.bound == Bound.UPPER and entry.value <= alpha):
+                    self.__unplay(state)
+                    return entry.value
+            if entry.move is not None:
+                best_col = state.get_num_cols() - 1 - entry.move if mirrored else entry.move
 
-        if maximizing_player:
-            max_eval = -math.inf
-            for action in cloned_state.get_possible_actions():
-                eval = self.minimax(cloned_state.clone(), depth - 1, alpha, beta, False, action)
-                max_eval = max(max_eval, eval)
+        original_alpha, original_beta = alpha, beta
+        best_action = None
+        side = 1 if maximizing_player else 0
+        self.__ply += 1
+        if depth == 1 and self.vectorized and not self.incremental:
+            best_eval, best_action = self.__search_leaves(state, maximizing_player)
+        elif maximizing_player:
+            best_eval = -math.inf
+            for action in self.__order_actions(state, best_col, side):
+                eval = self.minimax(state, depth - 1, alpha, beta, False, action)
+                if eval > best_eval:
+                    best_eval = eval
+                    best_action = action
                 alpha = max(alpha, eval)
                 if beta <= alpha:
+                    self.__record_cutoff(action.get_col(), side, depth)
                     break
-
-            self.transposition_table[state_key] = (depth, max_eval)
-            return max_eval
         else:
-            min_eval = math.inf
-            for action in cloned_state.get_possible_actions():
-                eval = self.minimax(cloned_state.clone(), depth - 1, alpha, beta, True, action)
-                min_eval = min(min_eval, eval)
+            best_eval = math.inf
+            for action in self.__order_actions(state, best_col, side):
+                eval = self.minimax(state, depth - 1, alpha, beta, True, action)
+                if eval < best_eval:
+                    best_eval = eval
+                    best_action = action
                 beta = min(beta, eval)
                 if beta <= alpha:
+                    self.__record_cutoff(action.get_col(), side, depth)
                     break
+        self.__ply -= 1
 
-            self.transposition_table[state_key] = (depth, min_eval)
-            return min_eval
-
-    def __heuristic(self, state: Connect4State):
-        grid = state.get_grid()
-        longest_self = 0
-        longest_opponent = 0
-        potential_wins_self = 0
-        potential_wins_opponent = 0
-
-        for row in range(state.get_num_rows()):
-            for col in range(state.get_num_cols()):
-                if grid[row][col] == self.get_current_pos():
-                    longest_self, potential_wins_self = self.__evaluate_position(grid, row, col, longest_self, potential_wins_self, self.get_current_pos())
-                elif grid[row][col] != 0:
-                    longest_opponent, potential_wins_opponent = self.__evaluate_position(grid, row, col, longest_opponent, potential_wins_opponent, grid[row][col])
-
-        return (longest_self - longest_opponent) + (potential_wins_self - potential_wins_opponent)
-
-    def __evaluate_position(self, grid, row, col, longest, potential_wins, player):
-        if col <= len(grid[0]) - 4:
-            sequence = self.__count_sequence(grid, row, col, 0, 1, player)
-            longest = max(longest, sequence)
-            if sequence >= 3:
-                potential_wins += 1
-        if row <= len(grid) - 4:
-            sequence = self.__count_sequence(grid, row, col, 1, 0, player)
-            longest = max(longest, sequence)
-            if sequence >= 3:
-                potential_wins += 1
-        if col <= len(grid[0]) - 4 and row <= len(grid) - 4:
-            sequence = self.__count_sequence(grid, row, col, 1, 1, player)
-            longest = max(longest, sequence)
-            if sequence >= 3:
-                potential_wins += 1
-        if col <= len(grid[0]) - 4 and row >= 3:
-            sequence = self.__count_sequence(grid, row, col, -1, 1, player)
-            longest = max(longest, sequence)
-            if sequence >= 3:
-                potential_wins += 1
-        return longest, potential_wins
-
-    def __count_sequence(self, grid, row, col, d_row, d_col, player):
-        count = 0
-        while 0 <= row < len(grid) and 0 <= col < len(grid[0]) and grid[row][col] == player:
-            count += 1
-            row += d_row
-            col += d_col
-        return count
+        self.__unplay(state)
+
+        # the value is only exact if it is strictly inside the search window
+        if best_eval <= original_alpha:
+            bound = Bound.UPPER
+        elif best_eval >= original_beta:
+            bound = Bound.LOWER
+        else:
+            bound = Bound.EXACT
+        best_col = best_action.get_col()
+        self.transposition_table.put(key, depth, bound, best_eval,
+                                     state.get_num_cols() - 1 - best_col if mirrored else best_col)
+        return best_eval
+
+    def get_consumed_events(self):
+        # this player ignores all the game events
+        return set()
 
     def event_action(self, pos: int, action, new_state: State):
         # ignore
@@ -115,3 +513,17 @@ class MinimaxConnect4Player(Connect4Player):
         # ignore
         pass
 
+    # the worker processes, the transposition table and the memory-mapped opening book are not sent when the player is
+    # pickled
+    def __getstate__(self):
+        state = self.__dict__.copy()
+        state['_MinimaxConnect4Player__executors'] = None
+        state['transposition_table'] = None
+        state['opening_book'] = None
+        return state
+
+    # the opening book is loaded again from its file, once per process
+    def __setstate__(self, state):
+        self.__dict__.update(state)
+        if self.opening_book_path is not None:
+            self.opening_book = load_book(self.opening_book_path)
@@ -0,0 +1,71 @@
+from typing import Optional
+
+from games.connect4.player import Connect4Player
+from games.connect4.players.minimax import MinimaxConnect4Player
+from games.connect4.solved_cache import DEFAULT_CACHE_PATH, load_cache
+from games.connect4.solver import Connect4Solver
+from games.connect4.state import Connect4State
+from games.player_event import PlayerEvent
+from games.state import State
+
+
+class SolverConnect4Player(Connect4Player):
+    """
+    the number of new solved positions that are kept in memory before they are saved at the end of a game. The rest
+    are saved when the process exits
+    """
+    SAVE_INTERVAL = 4096
+
+    """
+    :param max_empty_cells: the positions with up to this number of empty cells are solved and played perfectly. The
+    solver is written in Python, so solving earlier positions can take from seconds to hours; they are played by a
+    minimax search instead
+    :param cache_path: the file where the solved positions are kept between runs, or None to not keep them
+    :param fallback_depth: the search depth of the minimax search of the positions that are not solved
+    """
+    def __init__(self, name, max_empty_cells: int = 22, cache_path: Optional[str] = DEFAULT_CACHE_PATH,
+                 fallback_depth: int = 5):
+        super().__init__(name)
+        self.max_empty_cells = max_empty_cells
+        self.cache_path = cache_path
+
+        """
+        a solver for each board size, created on the first move on that board, and the search of the positions that
+        are not solved
+        """
+        self.__solvers = {}
+        self.__fallback = MinimaxConnect4Player(name, fallback_depth)
+
+    def __get_solver(self, state: Connect4State):
+        # None if the board is too large for the solver
+        size = (state.get_num_rows(), state.get_num_cols())
+        if size not in self.__solvers:
+            if (size[0] + 1) * size[1] > 64:
+                self.__solvers[size] = None
+            else:
+                cache = None if self.cache_path is None else load_cache(self.cache_path, *size)
+                self.__solvers[size] = Connect4Solver(*size, cache=cache)
+        return self.__solvers[size]
+
+    def get_action(self, state: Connect4State):
+        num_empty_cells = state.get_num_rows() * state.get_num_cols() - state.get_num_checkers()
+        solver = self.__get_solver(state)
+        if solver is not None and num_empty_cells <= self.max_empty_cells:
+            return solver.get_best_action(state)
+
+        self.__fallback.set_current_pos(self.get_current_pos())
+        return self.__fallback.get_action(state)
+
+    def get_consumed_events(self):
+        # the new solved positions are saved at the end of a game, once enough of them were found
+        return {PlayerEvent.END_GAME}
+
+    def event_action(self, pos: int, action, new_state: State):
+        # ignore
+        pass
+
+    def event_end_game(self, final_state: State):
+        solver = self.__solvers.get((final_state.get_num_rows(), final_state.get_num_cols()))
+        if solver is not None and solver.get_cache() is not None \
+                and solver.get_cache().get_num_unsaved() >= SolverConnect4Player.SAVE_INTERVAL:
+            solver.get_cache().save()
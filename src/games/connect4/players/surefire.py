@@ -31,6 +31,10 @@ class SurefireConnect4Player(Connect4Player):
 
         return best_action
 
+    def get_consumed_events(self):
+        # this player ignores all the game events
+        return set()
+
     def event_action(self, pos: int, action, new_state: State):
         # ignore
         pass
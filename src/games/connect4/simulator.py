@@ -1,8 +1,18 @@
+import random
+
 from games.connect4.action import Connect4Action
 from games.connect4.player import Connect4Player
 from games.connect4.state import Connect4State
+from games.connect4.result import Connect4Result
 from games.game_simulator import GameSimulator
 
+try:
+    import numpy as np
+    from games.connect4.batched_engine import BatchedConnect4Engine, get_batched_policy
+except ImportError:
+    # numpy is optional, without it the games are always played one by one
+    BatchedConnect4Engine = None
+
 
 class Connect4Simulator(GameSimulator):
 
@@ -14,9 +24,51 @@ class Connect4Simulator(GameSimulator):
         self.__num_rows = num_rows
         self.__num_cols = num_cols
 
+        """
+        the policies of the players when they can play in batches, in their original seats
+        """
+        self.__batched_policies = None
+        if BatchedConnect4Engine is not None:
+            policies = [get_batched_policy(player) for player in players]
+            if None not in policies:
+                self.__batched_policies = {player.get_name(): policy for player, policy in zip(players, policies)}
+
+    """
+    the maximum number of games the batched engine plays at once, to bound its memory use
+    """
+    MAX_BATCH_SIZE = 1 << 14
+
     def on_init_game(self):
         return Connect4State(self.__num_rows, self.__num_cols)
 
+    def can_run_batched(self) -> bool:
+        # the latencies of the players can only be profiled when they play one game at a time
+        return self.__batched_policies is not None and self.get_profile() is None
+
+    """
+    plays a number of games at once with the current seats, as if run_simulation was called that many times, and adds
+    their results. Only called when can_run_batched is True
+    :param num_games: the number of games to play
+    """
+    def run_batched_simulations(self, num_games: int):
+        players = self.get_player_positions()
+        policies = [self.__batched_policies[player.get_name()] for player in players]
+        engine = BatchedConnect4Engine(self.__num_rows, self.__num_cols)
+
+        # the numpy generator is seeded from the random module, so seeded simulations stay reproducible
+        rng = np.random.default_rng(random.getrandbits(64))
+
+        for first_game in range(0, num_games, Connect4Simulator.MAX_BATCH_SIZE):
+            batch_size = min(Connect4Simulator.MAX_BATCH_SIZE, num_games - first_game)
+            winners, lengths = engine.play(policies, batch_size, rng)
+
+            results = {}
+            for pos, player in enumerate(players):
+                scores = np.where(winners == pos, Connect4Result.WIN.value, Connect4Result.LOOSE.value)
+                scores[winners < 0] = Connect4Result.DRAW.value
+                results[player.get_name()] = scores.tolist()
+            self.add_batched_results(results, lengths.tolist())
+
     def on_before_end_game(self, state: Connect4State):
         # ignored for this simulator
         pass
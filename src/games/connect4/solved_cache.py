@@ -0,0 +1,194 @@
+import mmap
+import os
+import struct
+from contextlib import contextmanager
+from functools import lru_cache
+from multiprocessing.util import Finalize
+from typing import Optional
+try:
+    import fcntl
+except ImportError:
+    # without file locks (e.g., on Windows), two processes saving at the very same time can lose some positions
+    fcntl = None
+
+"""
+the solved positions the solver player uses by default
+"""
+DEFAULT_CACHE_PATH = os.path.join(os.path.dirname(os.path.abspath(__file__)), "solved_positions.bin")
+
+"""
+the header of a cache file: a magic string, the number of rows and cols of the board, and the number of entries
+"""
+HEADER = struct.Struct("<4sHHI")
+MAGIC = b"C4SP"
+
+"""
+each entry is the key of a position and its exact score. The entries are sorted by key, so a position is found with a
+binary search
+"""
+ENTRY = struct.Struct("<Qb")
+
+
+class SolvedPositionCache:
+    """
+    The exact scores of solved connect4 positions, kept between runs. The file is memory-mapped, so the processes that
+    use the same cache share a single copy of it, and only the pages that are searched are read from disk. The positions
+    solved since the file was loaded are kept in memory until save is called
+    """
+
+    def __init__(self, path: str, num_rows: int = 6, num_cols: int = 7):
+        self.__path = path
+        self.__num_rows = num_rows
+        self.__num_cols = num_cols
+
+        """
+        the memory-mapped file, if it exists, and the new entries
+        """
+        self.__data = None
+        self.__num_entries = 0
+        self.__new_entries = {}
+
+        self.__load()
+
+    def __load(self):
+        self.close()
+        if not os.path.exists(self.__path):
+            return
+
+        with open(self.__path, "rb") as file:
+            data = mmap.mmap(file.fileno(), 0, access=mmap.ACCESS_READ)
+
+        magic, num_rows, num_cols, num_entries = HEADER.unpack_from(data, 0)
+        if magic != MAGIC or HEADER.size + num_entries * ENTRY.size != len(data):
+            data.close()
+            raise Exception(f"{self.__path} is not a valid cache of solved connect4 positions")
+        if (num_rows, num_cols) != (self.__num_rows, self.__num_cols):
+            data.close()
+            raise Exception(f"{self.__path} has the positions of a {num_rows}x{num_cols} board")
+
+        self.__data = data
+        self.__num_entries = num_entries
+
+    def __len__(self):
+        return self.__num_entries + len(self.__new_entries)
+
+    # the index of the first entry of the file whose key is not lower than the key
+    def __search(self, key: int) -> int:
+        low, high = 0, self.__num_entries
+        while low < high:
+            middle = (low + high) // 2
+            entry_key, _score = ENTRY.unpack_from(self.__data, HEADER.size + middle * ENTRY.size)
+            if entry_key < key:
+                low = middle + 1
+            else:
+                high = middle
+        return low
+
+    def __find(self, key: int) -> Optional[int]:
+        index = self.__search(key)
+        if index < self.__num_entries:
+            entry_key, score = ENTRY.unpack_from(self.__data, HEADER.size + index * ENTRY.size)
+            if entry_key == key:
+                return score
+        return None
+
+    """
+    Gets the score of a position, or None if it was not solved yet
+    """
+    def get(self, key: int) -> Optional[int]:
+        score = self.__new_entries.get(key)
+        if score is None and self.__data is not None:
+            score = self.__find(key)
+        return score
+
+    def put(self, key: int, score: int):
+        if self.get(key) is None:
+            self.__new_entries[key] = score
+
+    """
+    Determines if there are solved positions that were not saved yet
+    """
+    def is_dirty(self) -> bool:
+        return len(self.__new_entries) > 0
+
+    def get_num_unsaved(self) -> int:
+        return len(self.__new_entries)
+
+    """
+    Writes the new positions to the file. The processes that save the same file take turns with a file lock, and the
+    file is read again once the lock is taken, so the positions saved in the meantime by other processes are kept.
+    The file is already sorted, so the sorted new positions are inserted between its entries, and the entries between
+    two insertions are copied in a single block
+    """
+    def save(self):
+        if not self.__new_entries:
+            return
+
+        new_entries = self.__new_entries
+        self.__new_entries = {}
+        with self.__lock():
+            self.__load()
+
+            # another process may have saved some of the same positions
+            keys = [key for key in sorted(new_entries) if self.__data is None or self.__find(key) is None]
+            if not keys:
+                return
+
+            temp_path = f"{self.__path}.{os.getpid()}.tmp"
+            with open(temp_path, "wb") as file:
+                file.write(HEADER.pack(MAGIC, self.__num_rows, self.__num_cols, self.__num_entries + len(keys)))
+                copied = 0
+                for key in keys:
+                    index = 0 if self.__data is None else self.__search(key)
+                    if index > copied:
+                        file.write(self.__data[HEADER.size + copied * ENTRY.size:HEADER.size + index * ENTRY.size])
+                        copied = index
+                    file.write(ENTRY.pack(key, new_entries[key]))
+                if self.__num_entries > copied:
+                    file.write(self.__data[HEADER.size + copied * ENTRY.size:])
+            os.replace(temp_path, self.__path)
+
+            self.__load()
+
+    # holds the lock of the file, if the platform has file locks
+    @contextmanager
+    def __lock(self):
+        if fcntl is None:
+            yield
+            return
+        with open(f"{self.__path}.lock", "a") as file:
+            fcntl.flock(file, fcntl.LOCK_EX)
+            try:
+                yield
+            finally:
+                fcntl.flock(file, fcntl.LOCK_UN)
+
+    def close(self):
+        if self.__data is not None:
+            self.__data.close()
+        self.__data = None
+        self.__num_entries = 0
+
+
+"""
+the caches that are saved when the current process exits, by the id of the process that registered them. A forked
+process inherits the caches of its parent, but not its exit handlers
+"""
+__saved_at_exit = set()
+
+
+"""
+Loads the cache of a file once per process, so all the players of a process share it. The new positions are saved
+when the process exits, including the worker processes of a pool, which don't run the atexit handlers
+"""
+def load_cache(path: str, num_rows: int, num_cols: int) -> SolvedPositionCache:
+    cache = __load_cache(path, num_rows, num_cols)
+    if (os.getpid(), id(cache)) not in __saved_at_exit:
+        __saved_at_exit.add((os.getpid(), id(cache)))
+        Finalize(None, cache.save, exitpriority=0)
+    return cache
+
+
+@lru_cache(maxsize=None)
+def __load_cache(path: str, num_rows: int, num_cols: int) -> SolvedPositionCache:
+    return SolvedPositionCache(path, num_rows, num_cols)
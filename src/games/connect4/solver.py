@@ -0,0 +1,219 @@
+from typing import Optional
+
+from games.connect4.action import Connect4Action
+from games.connect4.bound import Bound
+from games.connect4.solved_cache import SolvedPositionCache
+from games.connect4.state import Connect4State
+from games.connect4.transposition_table import TranspositionTable, get_shared_table
+
+
+class Connect4Solver:
+    """
+    Finds the exact score of connect4 positions with a negamax search with alpha-beta pruning, run with null windows
+    (Pascal Pons' approach). The search only sees moves that don't lose right away, orders them by the number of
+    winning cells they create, and keeps upper bounds in a transposition table.
+    The score of a position is from the point of view of the player to move: 0 for a draw, and for a win (or a loss,
+    as a negative score) the number of checkers the winner has left when the game ends, plus 1. So faster wins have
+    higher scores.
+    Positions are stored as two bitboards: the checkers of the player to move and the occupied cells, with the same
+    layout as Connect4State. The board must fit in 64 bits, like the 6x7 default board.
+    This is pure Python, so only positions that are close enough to the end of the game can be solved in a reasonable
+    time: on 6x7, around 22 empty cells take under a second, and 28 empty cells can already take tens of seconds
+    """
+
+    def __init__(self, num_rows: int = 6, num_cols: int = 7, cache: Optional[SolvedPositionCache] = None,
+                 max_table_bytes: int = TranspositionTable.DEFAULT_MAX_BYTES):
+        if (num_rows + 1) * num_cols > 64:
+            raise Exception("the solver only supports boards that fit in 64 bits")
+
+        self.__num_rows = num_rows
+        self.__num_cols = num_cols
+        self.__num_cells = num_rows * num_cols
+        self.__stride = num_rows + 1
+
+        """
+        masks of the bottom cell of each column and of all the cells of the board
+        """
+        self.__bottom_mask = sum(1 << (col * self.__stride) for col in range(num_cols))
+        self.__board_mask = self.__bottom_mask * ((1 << num_rows) - 1)
+
+        """
+        the columns in the order they are searched, from the center to the edges
+        """
+        self.__column_order = sorted(range(num_cols), key=lambda col: abs(col - num_cols // 2))
+
+        """
+        the upper bounds of the positions found by the search, and the exact scores of the solved positions that are
+        kept between runs. The bounds are true for any search, so the solvers of a process share one table per board
+        size
+        """
+        self.__table = get_shared_table(f"solver-{num_rows}x{num_cols}", max_table_bytes)
+        self.__cache = cache
+
+        self.__num_nodes = 0
+
+    def get_num_nodes(self):
+        return self.__num_nodes
+
+    def get_cache(self):
+        return self.__cache
+
+    def __column_mask(self, col):
+        return ((1 << self.__num_rows) - 1) << (col * self.__stride)
+
+    def __get_winning_cells(self, position, mask):
+        # the empty cells that would complete a line of the position, found with shifts in each direction
+        stride = self.__stride
+        cells = (position << 1) & (position << 2) & (position << 3)
+        for shift in (stride, stride - 1, stride + 1):
+            pairs = (position << shift) & (position << 2 * shift)
+            cells |= pairs & (position << 3 * shift)
+            cells |= pairs & (position >> shift)
+            pairs = (position >> shift) & (position >> 2 * shift)
+            cells |= pairs & (position << shift)
+            cells |= pairs & (position >> 3 * shift)
+        return cells & (self.__board_mask ^ mask)
+
+    def __get_non_losing_moves(self, position, mask):
+        # the moves that don't let the opponent win on the next move: a forced block if the opponent has a single
+        # winning cell, and no move below a winning cell of the opponent
+        possible = (mask + self.__bottom_mask) & self.__board_mask
+        opponent_wins = self.__get_winning_cells(position ^ mask, mask)
+        forced = possible & opponent_wins
+        if forced:
+            if forced & (forced - 1):
+                # the opponent has two winning moves, one of them will be left open
+                return 0
+            possible = forced
+        return possible & ~(opponent_wins >> 1)
+
+    def __can_win_next(self, position, mask):
+        return self.__get_winning_cells(position, mask) & (mask + self.__bottom_mask) & self.__board_mask
+
+    def __get_key(self, position, mask):
+        # unique for each position, as the bit above the top checker of each column marks the height of the column
+        return position + mask
+
+    def __negamax(self, position, mask, num_moves, alpha, beta):
+        self.__num_nodes += 1
+
+        moves = self.__get_non_losing_moves(position, mask)
+        if moves == 0:
+            return -((self.__num_cells - num_moves) // 2)
+
+        # only draws are left with 2 moves or less, as the player to move can't win right away
+        if num_moves >= self.__num_cells - 2:
+            return 0
+
+        # the opponent can't win on its next move, so the score is above this
+        lowest = -((self.__num_cells - 2 - num_moves) // 2)
+        if alpha < lowest:
+            alpha = lowest
+            if alpha >= beta:
+                return alpha
+
+        # the player can't win on this move, so the score is below this
+        highest = (self.__num_cells - 1 - num_moves) // 2
+        key = self.__get_key(position, mask)
+        entry = self.__table.get(key)
+        if entry is not None:
+            highest = min(highest, entry.value)
+        if beta > highest:
+            beta = highest
+            if alpha >= beta:
+                return beta
+
+        # the moves that create the most winning cells are searched first
+        candidates = []
+        for col in self.__column_order:
+            move = moves & self.__column_mask(col)
+            if move:
+                candidates.append((-bin(self.__get_winning_cells(position | move, mask)).count("1"), len(candidates),
+                                   move))
+        candidates.sort()
+
+        for _score, _order, move in candidates:
+            score = -self.__negamax(position ^ mask, mask | move, num_moves + 1, -beta, -alpha)
+            if score >= beta:
+                return score
+            if score > alpha:
+                alpha = score
+
+        self.__table.put(key, 0, Bound.UPPER, alpha)
+        return alpha
+
+    def __solve(self, position, mask, num_moves):
+        if self.__can_win_next(position, mask):
+            return (self.__num_cells + 1 - num_moves) // 2
+
+        cache_key = None
+        if self.__cache is not None:
+            cache_key = min(self.__get_key(position, mask), self.__get_key(self.__mirror(position), self.__mirror(mask)))
+            score = self.__cache.get(cache_key)
+            if score is not None:
+                return score
+
+        # the score is narrowed down with null-window searches, which prune more than a search with the full window
+        low = -((self.__num_cells - num_moves) // 2)
+        high = (self.__num_cells + 1 - num_moves) // 2
+        while low < high:
+            middle = low + (high - low) // 2
+            if middle <= 0 and int(low / 2) < middle:
+                middle = int(low / 2)
+            elif middle >= 0 and high // 2 > middle:
+                middle = high // 2
+            score = self.__negamax(position, mask, num_moves, middle, middle + 1)
+            if score <= middle:
+                high = score
+            else:
+                low = score
+
+        if cache_key is not None:
+            self.__cache.put(cache_key, low)
+        return low
+
+    def __mirror(self, board):
+        # flips the columns of a bitboard left to right
+        mirrored = 0
+        column = (1 << self.__stride) - 1
+        for col in range(self.__num_cols):
+            mirrored |= ((board >> (col * self.__stride)) & column) << ((self.__num_cols - 1 - col) * self.__stride)
+        return mirrored
+
+    def __get_position(self, state: Connect4State):
+        if state.get_num_rows() != self.__num_rows or state.get_num_cols() != self.__num_cols:
+            raise Exception("the state has a different board size than the solver")
+        boards = state.get_bitboards()
+        return boards[state.get_acting_player()], boards[0] | boards[1], state.get_num_checkers()
+
+    """
+    Gets the exact score of a position, for the player to move (see the description of the class)
+    """
+    def solve(self, state: Connect4State) -> int:
+        if state.is_finished():
+            raise Exception("the game is already finished")
+        return self.__solve(*self.__get_position(state))
+
+    """
+    Gets the score of each move of a position, for the player to move, by column
+    """
+    def get_scores(self, state: Connect4State) -> dict:
+        position, mask, num_moves = self.__get_position(state)
+        scores = {}
+        for action in state.get_possible_actions():
+            move = (mask + self.__bottom_mask) & self.__column_mask(action.get_col())
+            if self.__get_winning_cells(position, mask) & move:
+                scores[action.get_col()] = (self.__num_cells + 1 - num_moves) // 2
+            elif num_moves + 1 == self.__num_cells:
+                scores[action.get_col()] = 0
+            else:
+                scores[action.get_col()] = -self.__solve(position ^ mask, mask | move, num_moves + 1)
+        return scores
+
+    """
+    Gets the best move of a position. The central columns are preferred among the moves with the same score
+    """
+    def get_best_action(self, state: Connect4State) -> Connect4Action:
+        scores = self.get_scores(state)
+        best_col = max(self.__column_order, key=lambda col: scores.get(col, -self.__num_cells))
+        return Connect4Action(best_col)
@@ -2,8 +2,10 @@ from typing import Optional
 
 from termcolor import colored
 
-from games.connect4.action import Connect4Action
+from games.connect4.action import Connect4Action, get_column_actions
+from games.connect4.lines import get_lines
 from games.connect4.result import Connect4Result
+from games.connect4.zobrist import get_zobrist_keys
 from games.state import State
 
 
@@ -25,9 +27,46 @@ class Connect4State(State):
         self.__num_cols = num_cols
 
         """
-        the grid
+        the board is stored as one bitboard per player. Each column takes num_rows + 1 bits (the extra bit is always 0,
+        so lines can't wrap around to the next column), starting from the bottom row. Python integers have no size
+        limit, so any board size is supported
         """
-        self.__grid = [[Connect4State.EMPTY_CELL for _i in range(self.__num_cols)] for _j in range(self.__num_rows)]
+        self.__stride = num_rows + 1
+        self.__boards = [0, 0]
+
+        """
+        a win can only complete one of the lines through the new checker. The boards that fit in 64 bits test the
+        bitboard masks of those lines (see get_lines). On larger boards, a mask is as large as the board, so they count
+        the checkers around the new one instead, in the checkers of each player in each column, as small bitboards of
+        num_rows bits. Either way, a move costs about the same on any board size
+        """
+        self.__columns = [[0] * num_cols, [0] * num_cols]
+        self.__is_large = self.__stride * num_cols > 64
+        self.__lines = get_lines(num_rows, num_cols)
+
+        """
+        the number of checkers in each column, and the action that plays in each column
+        """
+        self.__heights = [0] * num_cols
+        self.__actions = get_column_actions(num_cols)
+
+        """
+        the columns that were played, so moves can be undone
+        """
+        self.__moves = []
+
+        """
+        the grid is only built when it is requested, and then kept up to date by update and undo
+        """
+        self.__grid = None
+
+        """
+        the Zobrist hash of the position, and the hash of its mirror image (the board flipped left to right). Both are
+        updated incrementally by update and undo
+        """
+        self.__zobrist_keys = get_zobrist_keys(num_rows, num_cols)
+        self.__hash = 0
+        self.__mirror_hash = 0
 
         """
         counts the number of turns in the current game
@@ -44,46 +83,45 @@ class Connect4State(State):
         """
         self.__has_winner = False
 
-    def __check_winner(self, player):
-        # check for 4 across
-        for row in range(0, self.__num_rows):
-            for col in range(0, self.__num_cols - 3):
-                if self.__grid[row][col] == player and \
-                        self.__grid[row][col + 1] == player and \
-                        self.__grid[row][col + 2] == player and \
-                        self.__grid[row][col + 3] == player:
-                    return True
-
-        # check for 4 up and down
-        for row in range(0, self.__num_rows - 3):
-            for col in range(0, self.__num_cols):
-                if self.__grid[row][col] == player and \
-                        self.__grid[row + 1][col] == player and \
-                        self.__grid[row + 2][col] == player and \
-                        self.__grid[row + 3][col] == player:
-                    return True
-
-        # check upward diagonal
-        for row in range(3, self.__num_rows):
-            for col in range(0, self.__num_cols - 3):
-                if self.__grid[row][col] == player and \
-                        self.__grid[row - 1][col + 1] == player and \
-                        self.__grid[row - 2][col + 2] == player and \
-                        self.__grid[row - 3][col + 3] == player:
-                    return True
-
-        # check downward diagonal
-        for row in range(0, self.__num_rows - 3):
-            for col in range(0, self.__num_cols - 3):
-                if self.__grid[row][col] == player and \
-                        self.__grid[row + 1][col + 1] == player and \
-                        self.__grid[row + 2][col + 2] == player and \
-                        self.__grid[row + 3][col + 3] == player:
-                    return True
+    def __check_winner(self, board, col, height):
+        # only the lines through the new checker can have been completed
+        masks = self.__lines.masks
+        for index in self.__lines.cell_lines[col * self.__num_rows + height]:
+            if board & masks[index] == masks[index]:
+                return True
+        return False
 
+    def __check_winner_at(self, columns, col, height):
+        # counts the checkers in a row through the cell, in the column and then along the row and both diagonals
+        if height >= 3 and (columns[col] >> (height - 3)) & 15 == 15:
+            return True
+        for d_height in (0, 1, -1):
+            count = 1
+            other_col, other_height = col - 1, height - d_height
+            while count < 4 and other_col >= 0 and other_height >= 0 and (columns[other_col] >> other_height) & 1:
+                count += 1
+                other_col, other_height = other_col - 1, other_height - d_height
+            other_col, other_height = col + 1, height + d_height
+            while count < 4 and other_col < self.__num_cols and other_height >= 0 \
+                    and (columns[other_col] >> other_height) & 1:
+                count += 1
+                other_col, other_height = other_col + 1, other_height + d_height
+            if count >= 4:
+                return True
         return False
 
+    def __get_bit(self, row, col):
+        # rows of the grid are counted from the top, while the bits of a column start from the bottom
+        return 1 << (col * self.__stride + self.__num_rows - 1 - row)
+
     def get_grid(self):
+        if self.__grid is None:
+            grid = [[Connect4State.EMPTY_CELL for _i in range(self.__num_cols)] for _j in range(self.__num_rows)]
+            for col in range(0, self.__num_cols):
+                for height in range(0, self.__heights[col]):
+                    row = self.__num_rows - 1 - height
+                    grid[row][col] = 0 if self.__boards[0] & self.__get_bit(row, col) else 1
+            self.__grid = grid
         return self.__grid
 
     def get_num_players(self):
@@ -97,7 +135,7 @@ class Connect4State(State):
             return False
 
         # full column
-        if self.__grid[0][col] != Connect4State.EMPTY_CELL:
+        if self.__heights[col] >= self.__num_rows:
             return False
 
         return True
@@ -106,21 +144,77 @@ class Connect4State(State):
         col = action.get_col()
 
         # drop the checker
-        for row in range(self.__num_rows - 1, -1, -1):
-            if self.__grid[row][col] < 0:
-                self.__grid[row][col] = self.__acting_player
-                break
-
-        # determine if there is a winner
-        self.__has_winner = self.__check_winner(self.__acting_player)
+        height = self.__heights[col]
+        self.__boards[self.__acting_player] |= 1 << (col * self.__stride + height)
+        self.__columns[self.__acting_player][col] |= 1 << height
+        self.__update_hashes(col)
+        self.__heights[col] += 1
+        self.__moves.append(col)
+        if self.__grid is not None:
+            self.__grid[self.__num_rows - self.__heights[col]][col] = self.__acting_player
+
+        # determine if there is a winner (only the last player to move can have won)
+        if self.__is_large:
+            self.__has_winner = self.__check_winner_at(self.__columns[self.__acting_player], col, height)
+        else:
+            self.__has_winner = self.__check_winner(self.__boards[self.__acting_player], col, height)
 
         # switch to next player
         self.__acting_player = 1 if self.__acting_player == 0 else 0
 
         self.__turns_count += 1
 
+    def __update_hashes(self, col):
+        # toggles the checker of the acting player at the top of the column, so the same call adds and removes it
+        keys = self.__zobrist_keys[self.__acting_player]
+        height = self.__heights[col]
+        self.__hash ^= keys[col * self.__num_rows + height]
+        self.__mirror_hash ^= keys[(self.__num_cols - 1 - col) * self.__num_rows + height]
+
+    """
+    Determines if dropping a checker in a column would make a player win, without changing the state
+    :param action: the column to play, which must be valid
+    :param player: the player that drops the checker. Defaults to the acting player
+    """
+    def is_winning_action(self, action: Connect4Action, player: Optional[int] = None) -> bool:
+        if player is None:
+            player = self.__acting_player
+        col = action.get_col()
+        height = self.__heights[col]
+        if self.__is_large:
+            columns = self.__columns[player]
+            # the checker is added for the check and removed right after
+            columns[col] |= 1 << height
+            has_winner = self.__check_winner_at(columns, col, height)
+            columns[col] &= ~(1 << height)
+            return has_winner
+        return self.__check_winner(self.__boards[player] | (1 << (col * self.__stride + height)), col, height)
+
+    """
+    Reverts the last update, restoring the board, the acting player, the turn count and the winner exactly.
+    Search algorithms can play and undo moves on a single state instead of cloning it at every node
+    """
+    def undo(self):
+        col = self.__moves.pop()
+
+        # switch back to the player that made the move
+        self.__acting_player = 1 if self.__acting_player == 0 else 0
+
+        # remove the checker
+        self.__heights[col] -= 1
+        self.__boards[self.__acting_player] &= ~(1 << (col * self.__stride + self.__heights[col]))
+        self.__columns[self.__acting_player][col] &= ~(1 << self.__heights[col])
+        self.__update_hashes(col)
+        if self.__grid is not None:
+            self.__grid[self.__num_rows - 1 - self.__heights[col]][col] = Connect4State.EMPTY_CELL
+
+        # the game was not over before the move, as no moves are played after a win
+        self.__has_winner = False
+
+        self.__turns_count -= 1
+
     def __display_cell(self, row, col):
-        cell_value = self.__grid[row][col]
+        cell_value = self.get_grid()[row][col]
         if cell_value == 0:
             # Player 1 - Red
             print(colored('●', 'red'), end="")
@@ -172,9 +266,12 @@ class Connect4State(State):
         cloned_state.__turns_count = self.__turns_count
         cloned_state.__acting_player = self.__acting_player
         cloned_state.__has_winner = self.__has_winner
-        for row in range(0, self.__num_rows):
-            for col in range(0, self.__num_cols):
-                cloned_state.__grid[row][col] = self.__grid[row][col]
+        cloned_state.__boards = self.__boards.copy()
+        cloned_state.__columns = [self.__columns[0].copy(), self.__columns[1].copy()]
+        cloned_state.__heights = self.__heights.copy()
+        cloned_state.__moves = self.__moves.copy()
+        cloned_state.__hash = self.__hash
+        cloned_state.__mirror_hash = self.__mirror_hash
         return cloned_state
 
     def get_result(self, pos):
@@ -184,6 +281,29 @@ class Connect4State(State):
             return Connect4Result.DRAW.value
         return None
 
+    """
+    Gets the Zobrist hash of the position. The player to move is not part of the hash, as it follows from the number
+    of checkers on the board
+    """
+    def get_hash(self) -> int:
+        return self.__hash
+
+    """
+    Gets the Zobrist hash of the mirror image of the position, so symmetric positions can share the same key
+    """
+    def get_mirror_hash(self) -> int:
+        return self.__mirror_hash
+
+    """
+    Gets the bitboard of each player. Each column takes num_rows + 1 bits, starting from the bottom row, and the extra
+    bit at the top of each column is always 0
+    """
+    def get_bitboards(self) -> tuple:
+        return self.__boards[0], self.__boards[1]
+
+    def get_num_checkers(self) -> int:
+        return self.__turns_count - 1
+
     def get_num_rows(self):
         return self.__num_rows
 
@@ -194,9 +314,5 @@ class Connect4State(State):
         pass
 
     def get_possible_actions(self):
-        return list(filter(
-            lambda action: self.validate_action(action),
-            map(
-                lambda pos: Connect4Action(pos),
-                range(0, self.get_num_cols()))
-        ))
+        num_rows = self.__num_rows
+        return [action for action, height in zip(self.__actions, self.__heights) if height < num_rows]
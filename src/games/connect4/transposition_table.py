@@ -0,0 +1,130 @@
+from array import array
+from collections import namedtuple
+from functools import lru_cache
+
+from games.connect4.bound import Bound
+
+
+"""
+An entry of the transposition table. The move is the best move found by the search, or None if there was none
+"""
+TableEntry = namedtuple("TableEntry", ["depth", "bound", "value", "move"])
+
+"""
+the bounds by their stored value
+"""
+BOUNDS = tuple(sorted(Bound, key=lambda bound: bound.value))
+
+
+class TranspositionTable:
+    """
+    the default size of a table, in bytes
+    """
+    DEFAULT_MAX_BYTES = 1 << 23
+
+    """
+    the bytes taken by each entry: the low 64 bits of the key, the search that stored it, the value, the depth, the
+    move and the bound, each in its own array
+    """
+    ENTRY_BYTES = 8 + 4 + 4 + 2 + 2 + 1
+
+    """
+    :param max_bytes: the memory used by the table, in bytes. The table holds max_bytes // ENTRY_BYTES entries
+    """
+    def __init__(self, max_bytes: int = DEFAULT_MAX_BYTES):
+        self.__max_entries = max_bytes // TranspositionTable.ENTRY_BYTES
+        if self.__max_entries < 1:
+            raise Exception(f"the transposition table needs at least {TranspositionTable.ENTRY_BYTES} bytes")
+
+        """
+        the table has a fixed number of slots, in compact arrays that are only allocated when the first entry is
+        stored, so its memory use never grows. A position can only be stored in the slot given by its key. The keys
+        can be longer than 64 bits, so only their low 64 bits are kept to check the slot holds the same position
+        """
+        self.__keys = None
+        self.__depths = None
+        self.__bounds = None
+        self.__values = None
+        self.__moves = None
+
+        """
+        the search that stored each entry, or 0 for the empty slots. Entries from previous searches are always
+        replaced, so the table doesn't fill up with deep entries of positions that can no longer be reached
+        """
+        self.__generations = None
+        self.__generation = 1
+
+    def get_max_entries(self):
+        return self.__max_entries
+
+    def get_max_bytes(self):
+        return self.__max_entries * TranspositionTable.ENTRY_BYTES
+
+    def __allocate(self):
+        size = self.__max_entries
+        self.__keys = array('Q', [0]) * size
+        self.__generations = array('I', [0]) * size
+        self.__values = array('i', [0]) * size
+        self.__depths = array('h', [0]) * size
+        self.__moves = array('h', [0]) * size
+        self.__bounds = array('b', [0]) * size
+
+    """
+    Starts a new search: the entries stored so far can still be read, but are replaced first
+    """
+    def new_search(self):
+        self.__generation += 1
+
+    """
+    Gets the entry stored for a key, or None if the position is not in the table
+    """
+    def get(self, key: int):
+        if self.__keys is None:
+            return None
+        index = key % self.__max_entries
+        if self.__generations[index] == 0 or self.__keys[index] != key & 0xFFFFFFFFFFFFFFFF:
+            return None
+        move = self.__moves[index]
+        # built as a plain tuple, which is cheaper than calling the constructor of the namedtuple
+        return tuple.__new__(TableEntry, (self.__depths[index], BOUNDS[self.__bounds[index]], self.__values[index],
+                                          None if move < 0 else move))
+
+    """
+    Stores the result of a search. The entry replaces the one already in its slot if that one is for the same position,
+    comes from a previous search or was searched less deep
+    """
+    def put(self, key: int, depth: int, bound: Bound, value, move=None):
+        if self.__keys is None:
+            self.__allocate()
+        index = key % self.__max_entries
+        key &= 0xFFFFFFFFFFFFFFFF
+        if self.__generations[index] == self.__generation and self.__keys[index] != key \
+                and self.__depths[index] > depth:
+            return
+        self.__keys[index] = key
+        self.__generations[index] = self.__generation
+        self.__values[index] = value
+        self.__depths[index] = depth
+        self.__moves[index] = -1 if move is None else move
+        self.__bounds[index] = bound.value
+
+    # empties the table, but keeps its memory
+    def clear(self):
+        if self.__generations is not None:
+            self.__generations = array('I', [0]) * self.__max_entries
+
+    def __len__(self):
+        if self.__generations is None:
+            return 0
+        return self.__max_entries - self.__generations.count(0)
+
+
+"""
+Gets the transposition table of this process for a kind of values (e.g., the values of a given evaluation), so all the
+searches of a process that store the same values share a single table instead of allocating one each
+:param kind: the name of the values stored in the table. Tables of different kinds never share entries
+:param max_bytes: the size of the table, in bytes
+"""
+@lru_cache(maxsize=None)
+def get_shared_table(kind: str, max_bytes: int = TranspositionTable.DEFAULT_MAX_BYTES) -> TranspositionTable:
+    return TranspositionTable(max_bytes)
@@ -0,0 +1,76 @@
+from functools import lru_cache
+
+import numpy as np
+
+"""
+the value of the extra cell the rays point to once they leave the board. It never matches a cell of the grid, so a
+sequence always stops at the edge of the board
+"""
+SENTINEL = -9
+
+
+"""
+Gets the rays the heuristic of the minimax player scans for a board size, as one row of flat cell indexes per ray.
+Each ray starts at a cell and goes in one direction up to the edge of the board, and is padded with the index of the
+sentinel cell (num_rows * num_cols). Like the original heuristic, the rays go right, down, down-right and up-right, and
+only start from the cells that have room for 4 checkers in that direction
+"""
+@lru_cache(maxsize=None)
+def get_rays(num_rows: int, num_cols: int):
+    length = max(num_rows, num_cols)
+    sentinel_index = num_rows * num_cols
+    rays = []
+    for row in range(num_rows):
+        for col in range(num_cols):
+            for d_row, d_col, has_room in ((0, 1, col <= num_cols - 4),
+                                           (1, 0, row <= num_rows - 4),
+                                           (1, 1, col <= num_cols - 4 and row <= num_rows - 4),
+                                           (-1, 1, col <= num_cols - 4 and row >= 3)):
+                if not has_room:
+                    continue
+                ray = []
+                r, c = row, col
+                while 0 <= r < num_rows and 0 <= c < num_cols:
+                    ray.append(r * num_cols + c)
+                    r += d_row
+                    c += d_col
+                rays.append(ray + [sentinel_index] * (length - len(ray)))
+    return np.array(rays, dtype=np.intp)
+
+
+"""
+Scores a batch of connect4 grids for a player, with exactly the same scores as the heuristic of the minimax player,
+quirks included: the cells that are neither the player's nor 0 (so the empty cells, and the opponent's cells when the
+player is 0) are scored as opponent sequences.
+:param grids: the grids to score, as a list of grids or an array of shape (batch, num_rows, num_cols)
+:param pos: the position of the player the grids are scored for
+:return: an array with the score of each grid
+"""
+def evaluate_grids(grids, pos: int):
+    cells = np.asarray(grids, dtype=np.int8)
+    batch, num_rows, num_cols = cells.shape
+
+    # the grids are flattened, with the sentinel cell at the end of each of them
+    flat = np.full((batch, num_rows * num_cols + 1), SENTINEL, dtype=np.int8)
+    flat[:, :-1] = cells.reshape(batch, -1)
+
+    # the length of a sequence is the number of cells equal to the first one before the first different cell
+    values = flat[:, get_rays(num_rows, num_cols)]
+    starts = values[:, :, 0]
+    lengths = np.cumprod(values == starts[:, :, None], axis=2).sum(axis=2)
+
+    own = starts == pos
+    opponent = ~own & (starts != 0)
+    longest_own = np.where(own, lengths, 0).max(axis=1)
+    longest_opponent = np.where(opponent, lengths, 0).max(axis=1)
+    potential_wins_own = (own & (lengths >= 3)).sum(axis=1)
+    potential_wins_opponent = (opponent & (lengths >= 3)).sum(axis=1)
+
+    return (longest_own - longest_opponent) + (potential_wins_own - potential_wins_opponent)
+
+
+"""
+Scores a single connect4 grid for a player, like evaluate_grids
+"""
+def evaluate_grid(grid, pos: int) -> int:
+    return int(evaluate_grids([grid], pos)[0])
@@ -0,0 +1,13 @@
+import random
+from functools import lru_cache
+
+
+"""
+Gets the Zobrist keys of a board size: one random 64-bit key for each player and cell, indexed as
+keys[player][col * num_rows + height]. The keys are generated from a fixed seed, so they are the same in every process
+and every run, and the hashes of the positions can be stored and compared across them
+"""
+@lru_cache(maxsize=None)
+def get_zobrist_keys(num_rows: int, num_cols: int):
+    rng = random.Random(f"connect4-zobrist:{num_rows}x{num_cols}")
+    return tuple(tuple(rng.getrandbits(64) for _cell in range(num_rows * num_cols)) for _player in range(2))
@@ -1,7 +1,13 @@
 from abc import ABC, abstractmethod
+from math import factorial
+from time import perf_counter
 
 from games.player import Player
-from games.state import State
+from games.player_event import PlayerEvent
+from games.result_store import ResultStore
+from games.running_score import RunningScore
+from games.simulation_profile import SimulationProfile
+from games.state import State, StateView
 
 
 class GameSimulator(ABC):
@@ -14,37 +20,52 @@ class GameSimulator(ABC):
         names = [player.get_name() for player in players]
         assert len(names) == len(set(names)), "Player names must be unique"
 
-        # stores the possible permutations between players
-        self.__permutations = []
+        # the players in their original seats
+        self.__players = list(players)
 
-        self.heap_permutation(players, len(players))
+        # the number of possible permutations of seats between players
+        self.__num_permutations = factorial(len(players))
 
         # the selected permutation for the current game
         self.__current_permutation = 0
 
+        # the seats of the selected permutation, only computed when the permutation changes
+        self.__current_positions = self.get_permutation(self.__current_permutation)
+
         # the results of all games between all players
-        self.__results = []
+        self.__results = ResultStore(names)
+
+        # the running score of each player, updated as each game finishes
+        self.__scores = {name: RunningScore() for name in names}
+
+        # the latencies of the players and the length of the games, only measured when profiling is enabled
+        self.__profile = None
 
     """
-    Adapted from https://www.geeksforgeeks.org/heaps-algorithm-for-generating-permutations/
-    It allows for generating all possible permutations of seats in a game
+    Computes the permutation of seats with a given index, in the same order as Heap's algorithm
+    (adapted from https://www.geeksforgeeks.org/heaps-algorithm-for-generating-permutations/), without generating
+    the permutations that come before it. Only the requested permutation is kept in memory
+    :param index: the index of the permutation, between [0, n![
     """
 
-    def heap_permutation(self, a: list, size: int):
-        if size == 1:
-            self.__permutations.append(a.copy())
+    def get_permutation(self, index: int) -> list:
+        a = self.__players.copy()
 
-        for i in range(0, size):
-            self.heap_permutation(a, size - 1)
+        # Heap's algorithm calls itself once per seat, so the index selects how many of those calls were completed
+        # at each level. A complete call over an odd number of seats leaves them unchanged, while a complete call
+        # over an even number of seats rotates them one place to the right
+        for size in range(len(a), 1, -1):
+            completed_calls, index = divmod(index, factorial(size - 1))
+            for i in range(0, completed_calls):
+                if (size - 1) % 2 == 0:
+                    a[0:size - 1] = a[size - 2:size - 1] + a[0:size - 2]
 
-            if size % 2 == 1:
-                temp = a[0]
-                a[0] = a[size - 1]
-                a[size - 1] = temp
-            else:
-                temp = a[i]
-                a[i] = a[size - 1]
-                a[size - 1] = temp
+                if size % 2 == 1:
+                    a[0], a[size - 1] = a[size - 1], a[0]
+                else:
+                    a[i], a[size - 1] = a[size - 1], a[i]
+
+        return a
 
     """
     Swaps the order of the players. The order is changed in a way that guarantees that all combinations are considered
@@ -65,8 +86,19 @@ class GameSimulator(ABC):
 
     def change_player_positions(self):
         self.__current_permutation += 1
-        if self.__current_permutation >= len(self.__permutations):
+        if self.__current_permutation >= self.__num_permutations:
             self.__current_permutation = 0
+        self.__current_positions = self.get_permutation(self.__current_permutation)
+
+    """
+    Selects the seats of the next games by the index of an iteration. The permutations are used in the same order as
+    change_player_positions, so the iteration i starts with the permutation i modulo the number of permutations
+    """
+    def set_current_permutation(self, iteration: int):
+        permutation = iteration % self.__num_permutations
+        if permutation != self.__current_permutation:
+            self.__current_permutation = permutation
+            self.__current_positions = self.get_permutation(permutation)
 
     """
     starts a new game
@@ -103,7 +135,18 @@ class GameSimulator(ABC):
 
 
     def get_player_positions(self):
-        return self.__permutations[self.__current_permutation]
+        return self.__current_positions
+
+    # gets the index of the seat permutation of the current game
+    def get_current_permutation(self):
+        return self.__current_permutation
+
+    """
+    determines if the simulator can play many games at once with the current players, with its own
+    run_batched_simulations(num_games). Simulators that can't play games in batches return False
+    """
+    def can_run_batched(self) -> bool:
+        return False
 
     """
     runs the simulation
@@ -112,27 +155,51 @@ class GameSimulator(ABC):
         state = self.on_init_game()
         players = self.get_player_positions()
 
+        # players get a read-only view of the state instead of a copy
+        view = StateView(state)
+
+        # only the players that consume an event are notified of it
+        events = [player.get_consumed_events() for player in players]
+        action_listeners = [player for player, consumed in zip(players, events) if PlayerEvent.ACTION in consumed]
+
+        # None when profiling is disabled
+        profile = self.__profile
+
         # notify players a new game is starting
         for pos in range(0, len(players)):
             players[pos].set_current_pos(pos)
-            players[pos].event_new_game()
+            if PlayerEvent.NEW_GAME in events[pos]:
+                self.__call_player(profile, players[pos], SimulationProfile.EVENT_NEW_GAME, players[pos].event_new_game)
 
         # play a turn
+        num_turns = 0
         while not state.is_finished():
+            num_turns += 1
             selected_action = None
             pos = state.get_acting_player()
 
-            # obtain a valid action
+            # obtain a valid action. The players are called directly when profiling is disabled, so the moves don't
+            # pay for an extra call
             while True:
-                selected_action = players[pos].get_action(state.clone())
+                if profile is None:
+                    selected_action = players[pos].get_action(view)
+                else:
+                    selected_action = self.__call_player(profile, players[pos], SimulationProfile.GET_ACTION,
+                                                         players[pos].get_action, view)
                 if state.validate_action(selected_action):
                     break
+                if profile is not None:
+                    profile.record_invalid_action(players[pos].get_name())
 
             state.play(selected_action)
 
             # notify players of the action
-            for player in players:
-                player.event_action(pos, selected_action, state.clone())
+            for player in action_listeners:
+                if profile is None:
+                    player.event_action(pos, selected_action, view)
+                else:
+                    self.__call_player(profile, player, SimulationProfile.EVENT_ACTION, player.event_action,
+                                       pos, selected_action, view)
 
             # the simulator will run an optional hanlder for each updated state
             self.on_state_update(state)
@@ -140,53 +207,115 @@ class GameSimulator(ABC):
         # handler to run before the game ends
         self.on_before_end_game(state)
 
+        results = [state.get_result(pos) for pos in range(len(players))]
+
         result = {}
-        for player in players:
+        for player, consumed in zip(players, events):
             # notify the player of the result in each position
-            for pos in range(len(players)):
-                player.event_result(pos, state.get_result(pos))
+            if PlayerEvent.RESULT in consumed:
+                for pos in range(len(players)):
+                    self.__call_player(profile, player, SimulationProfile.EVENT_RESULT, player.event_result,
+                                       pos, results[pos])
 
             # store the result for that player
-            result[player.get_name()] = state.get_result(player.get_current_pos())
-            player.event_end_game(state.clone())
+            result[player.get_name()] = results[player.get_current_pos()]
+            if PlayerEvent.END_GAME in consumed:
+                self.__call_player(profile, player, SimulationProfile.EVENT_END_GAME, player.event_end_game, view)
 
-        self.__results.append(result)
+        self.__add_result(result, self.__current_permutation, num_turns)
+        if profile is not None:
+            profile.record_game_length(num_turns)
 
         # handler to run after a game ends
         self.on_end_game(state)
 
+    # calls a method of a player, measuring its latency when profiling is enabled
+    @staticmethod
+    def __call_player(profile, player, phase, method, *args):
+        if profile is None:
+            return method(*args)
+        start = perf_counter()
+        value = method(*args)
+        profile.record_latency(player.get_name(), phase, perf_counter() - start)
+        return value
+
+    # stores the result of a game and updates the running scores
+    def __add_result(self, result: dict, permutation: int, num_turns: int):
+        self.__results.append(result, permutation, num_turns)
+        for name, score in result.items():
+            self.__scores[name].add(score)
+
     # prints the stats for all players
     def print_stats(self):
-        scores = self.get_global_score()
-        for player in self.__permutations[0]:
+        for player in self.__players:
             name = player.get_name()
-            print(f"Player {name} | Total score: {scores[name]}$ | Avg. score per game: {scores[name] / len(self.__results)}$")
+            score = self.__scores[name]
+            low, high = score.get_confidence_interval()
+            # the average is computed from the exact total, as the running mean carries rounding errors
+            average = score.get_total() / score.get_count() if score.get_count() > 0 else 0
+            print(f"Player {name} | Total score: {score.get_total()}$ | Avg. score per game: {average}$ | 95% CI: [{low:.4f}, {high:.4f}]$")
+
+    # starts measuring the latencies of the players and the length of the games
+    def enable_profiling(self):
+        if self.__profile is None:
+            self.__profile = SimulationProfile()
+
+    # gets the profile of the simulation, or None if profiling is disabled
+    def get_profile(self):
+        return self.__profile
+
+    # prints the latencies of the players and the length of the games, if profiling is enabled
+    def print_profile(self):
+        if self.__profile is not None:
+            self.__profile.print_stats([player.get_name() for player in self.__players])
 
     # returns the list of players
     def get_players(self):
-        return self.__permutations[0]
+        return self.__players
 
     # returns the ordered list of players for the current permutation
     def get_player_positions(self):
-        return self.__permutations[self.__current_permutation]
+        return self.__current_positions
 
     # gets the number os players
     def num_players(self):
-        return len(self.__permutations[0])
+        return len(self.__players)
 
-    # gets the results of all games
+    # gets the results of all games (kept in memory) as a list of dictionaries with the score of each player
     def get_results(self):
+        return list(self.__results.iter_results())
+
+    # gets the columnar store with the results of all games
+    def get_result_store(self):
         return self.__results
 
+    # adds the results of games that were played elsewhere (e.g., in a worker process)
+    def add_results(self, results: ResultStore):
+        for result, permutation, num_turns in results.iter_games():
+            self.__add_result(result, permutation, num_turns)
+
+    # adds the results of many games played with the current seats, as lists with the scores of each player
+    def add_batched_results(self, results: dict, num_turns: list):
+        self.__results.extend(results, self.__current_permutation, num_turns)
+        for name, scores in results.items():
+            self.__scores[name].add_all(scores)
+
+    # adds the running scores of games whose individual results are not available (e.g., cached from an earlier run)
+    def add_running_scores(self, scores: dict):
+        for name, score in scores.items():
+            self.__scores[name].merge(score)
+
+    # gets the number of games that were played
+    def get_num_games(self):
+        return self.__scores[self.__players[0].get_name()].get_count()
+
+    # gets the running score (total, mean and variance) of all players
+    def get_running_scores(self):
+        return self.__scores
+
     # gets the scores of all players
     def get_global_score(self):
-        scores = {}
-        for player in self.__permutations[0]:
-            name = player.get_name()
-            scores[name] = 0
-            for result in self.__results:
-                scores[name] += result[name]
-        return scores
+        return {name: score.get_total() for name, score in self.__scores.items()}
 
 
     @staticmethod
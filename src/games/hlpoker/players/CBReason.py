@@ -108,6 +108,10 @@ class CBReasonHLPokerPlayer(HLPokerPlayer):
         self.case_base.append(case)
         self.save_cases()
 
+    def get_consumed_events(self):
+        # this player ignores all the game events
+        return set()
+
     def event_my_action(self, action, new_state):
         pass
 
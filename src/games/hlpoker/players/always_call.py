@@ -13,6 +13,10 @@ class AlwaysCallHLPokerPlayer(HLPokerPlayer):
     def get_action_with_cards(self, state: HLPokerState, private_cards, board_cards):
         return HLPokerAction.CALL
 
+    def get_consumed_events(self):
+        # this player ignores all the game events
+        return set()
+
     def event_my_action(self, action, new_state):
         pass
 
@@ -16,6 +16,10 @@ class AlwaysRaiseHLPokerPlayer(HLPokerPlayer):
         else:
             return HLPokerAction.CALL
 
+    def get_consumed_events(self):
+        # this player ignores all the game events
+        return set()
+
     def event_my_action(self, action, new_state):
         pass
 
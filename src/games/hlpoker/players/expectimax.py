@@ -88,6 +88,10 @@ class ExpectimaxHLPokerPlayer(HLPokerPlayer):
 
         return new_state
 
+    def get_consumed_events(self):
+        # this player ignores all the game events
+        return set()
+
     def event_my_action(self, action, new_state):
         pass
 
@@ -12,6 +12,10 @@ class RandomHLPokerPlayer(HLPokerPlayer):
     def get_action_with_cards(self, state: HLPokerState, private_cards, board_cards):
         return choice(state.get_possible_actions())
 
+    def get_consumed_events(self):
+        # this player ignores all the game events
+        return set()
+
     def event_my_action(self, action, new_state):
         pass
 
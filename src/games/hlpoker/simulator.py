@@ -15,9 +15,10 @@ class HLPokerSimulator(GameSimulator):
     def __init__(self, players: list[HLPokerPlayer]):
         super().__init__(players)
         """
-        deck of cards
+        deck of cards, in its original order, and the deck of the current game
         """
-        self.__deck = [Card(rank, suit) for suit in Suit for rank in Rank]
+        self.__cards = [Card(rank, suit) for suit in Suit for rank in Rank]
+        self.__deck = list(self.__cards)
         """
         stores the current round of the current game being simulated
         """
@@ -28,7 +29,9 @@ class HLPokerSimulator(GameSimulator):
         self.__used_card_count = None
 
     def on_init_game(self):
-        # shuffle the deck
+        # shuffle the deck from its original order, so the cards of a game only depend on the random seed and not on
+        # the games played before it
+        self.__deck = list(self.__cards)
         shuffle(self.__deck)
 
         self.__used_card_count = 0
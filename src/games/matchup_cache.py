@@ -0,0 +1,64 @@
+import os
+import pickle
+from collections import namedtuple
+
+"""
+The cached outcome of a matchup: the number of iterations that were played, the running score of each player, and the
+index of the next iteration, after the ones that were played to break a draw
+"""
+# the files written before the next iteration was cached can still be loaded, although their keys no longer match
+CachedMatchup = namedtuple('CachedMatchup', ['num_iterations', 'scores', 'next_iteration'], defaults=[None])
+
+
+class MatchupCache:
+    """
+    Caches the outcome of the matchups of a tournament, keyed by the pair of players and the game settings, so the
+    pairs that already met are not simulated again in later elimination rounds. The cache can be persisted to a file,
+    so running a tournament again (e.g., with one new player) only simulates the new pairs
+    """
+
+    def __init__(self, path: str = None):
+        """
+        the file the cache is persisted to, if any
+        """
+        self.__path = path
+
+        """
+        the cached matchups
+        """
+        self.__matchups = {}
+
+        if self.__path is not None and os.path.exists(self.__path):
+            with open(self.__path, 'rb') as file:
+                self.__matchups = pickle.load(file)
+
+    """
+    builds the key of a matchup. The order of the players does not matter
+    :param game: the simulator class of the game
+    :param settings: the game settings that change the outcome of the games (e.g., seat permutation)
+    :param players: the players of the matchup
+    """
+    @staticmethod
+    def get_key(game, settings: tuple, players: list):
+        player_keys = sorted((player.get_name(), player.__class__.__qualname__) for player in players)
+        return game.__qualname__, settings, tuple(player_keys)
+
+    def get(self, key):
+        return self.__matchups.get(key)
+
+    """
+    stores the outcome of a matchup (and saves the cache to disk, if it is persisted)
+    :param key: the key of the matchup (see get_key)
+    :param num_iterations: the number of iterations that were played
+    :param scores: the running score of each player
+    :param next_iteration: the index of the next iteration of the matchup, if it is topped up
+    """
+    def put(self, key, num_iterations: int, scores: dict, next_iteration: int):
+        self.__matchups[key] = CachedMatchup(num_iterations, scores, next_iteration)
+
+        if self.__path is not None:
+            # the file is replaced atomically, so an interrupted tournament doesn't leave a broken cache behind
+            temp_path = f"{self.__path}.tmp"
+            with open(temp_path, 'wb') as file:
+                pickle.dump(self.__matchups, file)
+            os.replace(temp_path, self.__path)
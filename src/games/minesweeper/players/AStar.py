@@ -58,6 +58,10 @@ class AStarMinesweeperPlayer(MinesweeperPlayer):
                     count += 1
         return count
 
+    def get_consumed_events(self):
+        # this player ignores all the game events
+        return set()
+
     def event_action(self, pos: int, action, new_state: State):
         # ignore
         pass
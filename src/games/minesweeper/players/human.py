@@ -4,6 +4,7 @@ from games.minesweeper.action import MinesweeperAction
 from games.minesweeper.player import MinesweeperPlayer
 from games.minesweeper.result import MinesweeperResult
 from games.minesweeper.state import MinesweeperState
+from games.player_event import PlayerEvent
 
 
 class HumanMinesweeperPlayer(MinesweeperPlayer):
@@ -31,6 +32,10 @@ class HumanMinesweeperPlayer(MinesweeperPlayer):
                 print("Invalid input. Please enter row and column numbers separated by a space.")
                 continue
 
+    def get_consumed_events(self):
+        # the board is only displayed at the end of the game, with the result of the player
+        return {PlayerEvent.RESULT, PlayerEvent.END_GAME}
+
     def event_action(self, pos: int, action, new_state: MinesweeperState):
         # ignore
         pass
@@ -25,6 +25,10 @@ class MonteCarloMinesweeperPlayer(MinesweeperPlayer):
         best_action = min(mine_count, key=mine_count.get)
         return best_action
 
+    def get_consumed_events(self):
+        # this player ignores all the game events
+        return set()
+
     def event_action(self, pos: int, action, new_state):
         pass
 
@@ -14,6 +14,10 @@ class RandomMinesweeperPlayer(MinesweeperPlayer):
     def get_action(self, state: MinesweeperState):
         return choice(list(state.get_possible_actions()))
 
+    def get_consumed_events(self):
+        # this player ignores all the game events
+        return set()
+
     def event_action(self, pos: int, action, new_state: State):
         # ignore
         pass
@@ -64,6 +64,10 @@ class PlaySafeMinesweeperPlayer(MinesweeperPlayer):
 
         return risk
 
+    def get_consumed_events(self):
+        # this player ignores all the game events
+        return set()
+
     def event_action(self, pos: int, action, new_state: State):
         # ignore
         pass
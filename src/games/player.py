@@ -1,5 +1,6 @@
 from abc import ABC, abstractmethod
 
+from games.player_event import PlayerEvent
 from games.state import State
 
 
@@ -42,9 +43,16 @@ class Player(ABC):
     def print_stats(self):
         pass
 
+    """
+    Retrieves the set of events (see PlayerEvent) this player wants to be notified of. The simulator skips the callbacks
+    of the events that are not in this set. By default, the player is notified of all events
+    """
+    def get_consumed_events(self) -> set:
+        return set(PlayerEvent)
+
     """
     Method that returns an action for a certain game state
-    :param state: the current game state
+    :param state: a read-only view of the current game state (clone it to change it)
     """
     @abstractmethod
     def get_action(self, state):
@@ -61,7 +69,7 @@ class Player(ABC):
     A method that notifies the player that someone did a certain action. This can be used to log opponents actions
     :param pos: the position of the player that performed the action
     :param action: the action that was performed
-    :param new_state: the resulting game state
+    :param new_state: a read-only view of the resulting game state (clone it to keep it)
     """
     @abstractmethod
     def event_action(self, pos: int, action, new_state: State):
@@ -78,7 +86,7 @@ class Player(ABC):
 
     """
     A method that notifies the player that a game has ended
-    :param final_state: the final state of the game
+    :param final_state: a read-only view of the final state of the game
     """
     @abstractmethod
     def event_end_game(self, final_state: State):
@@ -0,0 +1,15 @@
+from enum import Enum
+
+
+class PlayerEvent(Enum):
+    """
+    the optional events a player can be notified of during a game:
+        - NEW_GAME: a new game is starting (event_new_game)
+        - ACTION: someone performed an action (event_action)
+        - RESULT: the result of a player is known (event_result)
+        - END_GAME: the game has ended (event_end_game)
+    """
+    NEW_GAME = 0
+    ACTION = 1
+    RESULT = 2
+    END_GAME = 3
@@ -0,0 +1,195 @@
+import csv
+import os
+from array import array
+
+
+class ResultStore:
+    """
+    A compact, columnar store for the results of the games between a set of players. It keeps one array per player with
+    the score in each game, plus the index of the seat permutation and the number of turns of each game.
+    Optionally, the results can be streamed to an append-only CSV file, with buffered writes, so they can be analysed
+    after the simulation. When they are not kept in memory, the memory used by the store does not grow with the number
+    of games
+    """
+    PERMUTATION_COLUMN = "permutation"
+    LENGTH_COLUMN = "length"
+
+    def __init__(self, player_names: list):
+        """
+        the names of the players, in the order of the columns
+        """
+        self.__player_names = list(player_names)
+
+        """
+        the scores are stored as integers until a score of another type is found (e.g., the float scores of poker)
+        """
+        self.__scores = {name: array('q') for name in self.__player_names}
+
+        """
+        the seat permutation and the number of turns of each game
+        """
+        self.__permutations = array('I')
+        self.__lengths = array('I')
+
+        """
+        number of games that were stored
+        """
+        self.__num_games = 0
+
+        """
+        the file the results are streamed to, if any, and whether they are still kept in memory
+        """
+        self.__file = None
+        self.__writer = None
+        self.__keep_in_memory = True
+
+    def __len__(self):
+        return self.__num_games
+
+    """
+    starts streaming the results to a CSV file. New results are appended to the file, and the header is only written
+    if the file is empty
+    :param path: the path of the file
+    :param keep_in_memory: if False, the results are only written to the file
+    :param buffer_size: the size in bytes of the write buffer
+    """
+    def stream_to(self, path: str, keep_in_memory: bool = True, buffer_size: int = 1 << 16):
+        self.close()
+
+        self.__file = open(path, 'a', newline='', buffering=buffer_size)
+        self.__writer = csv.writer(self.__file)
+        self.__keep_in_memory = keep_in_memory
+
+        if self.__file.tell() == 0:
+            self.__writer.writerow(self.__player_names + [ResultStore.PERMUTATION_COLUMN, ResultStore.LENGTH_COLUMN])
+
+    """
+    adds the result of a game
+    :param result: a dictionary with the score of each player
+    :param permutation: the index of the seat permutation used in the game
+    :param length: the number of turns of the game
+    """
+    def append(self, result: dict, permutation: int, length: int):
+        self.__num_games += 1
+
+        if self.__writer is not None:
+            self.__writer.writerow([result[name] for name in self.__player_names] + [permutation, length])
+
+        if self.__keep_in_memory:
+            for name in self.__player_names:
+                score = result[name]
+                if self.__scores[name].typecode == 'q' and not isinstance(score, int):
+                    self.__use_float_scores()
+                self.__scores[name].append(score)
+            self.__permutations.append(permutation)
+            self.__lengths.append(length)
+
+    """
+    adds the results of many games played with the same seat permutation
+    :param results: a dictionary with the list of scores of each player, one per game
+    :param permutation: the index of the seat permutation used in the games
+    :param lengths: the number of turns of each game
+    """
+    def extend(self, results: dict, permutation: int, lengths: list):
+        self.__num_games += len(lengths)
+
+        if self.__writer is not None:
+            columns = [results[name] for name in self.__player_names]
+            self.__writer.writerows([*scores, permutation, length] for *scores, length in zip(*columns, lengths))
+
+        if self.__keep_in_memory:
+            for name in self.__player_names:
+                scores = results[name]
+                if self.__scores[name].typecode == 'q' and not all(isinstance(score, int) for score in scores):
+                    self.__use_float_scores()
+                self.__scores[name].extend(scores)
+            self.__permutations.extend([permutation] * len(lengths))
+            self.__lengths.extend(lengths)
+
+    def __use_float_scores(self):
+        self.__scores = {name: array('d', scores) for name, scores in self.__scores.items()}
+
+    """
+    iterates over the games in memory, as tuples with (result, permutation, length)
+    """
+    def iter_games(self):
+        columns = [self.__scores[name] for name in self.__player_names]
+        for game in range(len(self.__permutations)):
+            result = {name: column[game] for name, column in zip(self.__player_names, columns)}
+            yield result, self.__permutations[game], self.__lengths[game]
+
+    """
+    iterates over the results of the games in memory, as dictionaries with the score of each player
+    """
+    def iter_results(self):
+        for result, _permutation, _length in self.iter_games():
+            yield result
+
+    def get_player_names(self):
+        return self.__player_names
+
+    def get_scores(self, name):
+        return self.__scores[name]
+
+    def get_permutations(self):
+        return self.__permutations
+
+    def get_lengths(self):
+        return self.__lengths
+
+    """
+    writes the buffered results to the file
+    """
+    def flush(self):
+        if self.__file is not None:
+            self.__file.flush()
+
+    """
+    stops streaming the results to a file
+    """
+    def close(self):
+        if self.__file is not None:
+            self.__file.close()
+        self.__file = None
+        self.__writer = None
+        self.__keep_in_memory = True
+
+    # the open file is not sent when the store is pickled (e.g., from a worker process)
+    def __getstate__(self):
+        state = self.__dict__.copy()
+        state['_ResultStore__file'] = None
+        state['_ResultStore__writer'] = None
+        return state
+
+    """
+    loads a store from a CSV file written by stream_to. The scores are read as floats (which also covers scores such as
+    1e-05, inf or nan), and the scores of a player are converted back to integers when all of them are whole numbers
+    :param path: the path of the file
+    """
+    @staticmethod
+    def read_csv(path: str):
+        with open(path, newline='') as file:
+            reader = csv.reader(file)
+            header = next(reader)
+            player_names = header[:-2]
+            rows = list(reader)
+
+        columns = [[float(row[index]) for row in rows] for index in range(len(player_names))]
+        columns = [[int(score) for score in column] if all(score.is_integer() for score in column) else column
+                   for column in columns]
+
+        store = ResultStore(player_names)
+        for game, row in enumerate(rows):
+            result = {name: column[game] for name, column in zip(player_names, columns)}
+            store.append(result, int(row[-2]), int(row[-1]))
+        return store
+
+    """
+    gets the path of the file used to store the results of a matchup in a directory
+    :param directory: the directory with the results
+    :param player_names: the names of the players in the matchup
+    """
+    @staticmethod
+    def get_matchup_path(directory: str, player_names: list):
+        file_name = "-vs-".join(name.replace(os.sep, "_") for name in player_names) + ".csv"
+        return os.path.join(directory, file_name)
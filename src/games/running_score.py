@@ -0,0 +1,97 @@
+from math import sqrt
+
+
+class RunningScore:
+    """
+    Keeps the total, mean and variance of the scores of a player, updated as each game finishes (Welford's online
+    algorithm), so they can be read in O(1) at any time
+    """
+
+    def __init__(self):
+        """
+        number of scores that were added
+        """
+        self.__count = 0
+
+        """
+        the sum of all scores
+        """
+        self.__total = 0
+
+        """
+        the running mean and the sum of the squared differences to the mean
+        """
+        self.__mean = 0.0
+        self.__m2 = 0.0
+
+    """
+    adds the score of a new game
+    :param score: the score of the player in that game
+    """
+    def add(self, score):
+        self.__count += 1
+        self.__total += score
+        delta = score - self.__mean
+        self.__mean += delta / self.__count
+        self.__m2 += delta * (score - self.__mean)
+
+    """
+    adds the scores of many games at once, which is faster than adding them one by one
+    :param scores: a list with the score of the player in each game
+    """
+    def add_all(self, scores):
+        if len(scores) == 0:
+            return
+        other = RunningScore()
+        other.__count = len(scores)
+        other.__total = sum(scores)
+        other.__mean = other.__total / other.__count
+        other.__m2 = sum((score - other.__mean) ** 2 for score in scores)
+        self.merge(other)
+
+    """
+    adds all the scores of another running score (Chan et al. parallel algorithm)
+    :param other: the running score to merge into this one
+    """
+    def merge(self, other):
+        if other.__count == 0:
+            return
+        count = self.__count + other.__count
+        delta = other.__mean - self.__mean
+        self.__mean += delta * other.__count / count
+        self.__m2 += other.__m2 + delta * delta * self.__count * other.__count / count
+        self.__count = count
+        self.__total += other.__total
+
+    def get_count(self):
+        return self.__count
+
+    def get_total(self):
+        return self.__total
+
+    def get_mean(self):
+        return self.__mean
+
+    """
+    gets the sample variance of the scores
+    """
+    def get_variance(self):
+        if self.__count < 2:
+            return 0.0
+        return self.__m2 / (self.__count - 1)
+
+    """
+    gets the standard error of the mean
+    """
+    def get_standard_error(self):
+        if self.__count < 2:
+            return 0.0
+        return sqrt(self.get_variance() / self.__count)
+
+    """
+    gets the confidence interval of the mean, using the normal approximation
+    :param z: the number of standard errors on each side (1.96 for a 95% interval)
+    """
+    def get_confidence_interval(self, z: float = 1.96):
+        margin = z * self.get_standard_error()
+        return self.__mean - margin, self.__mean + margin
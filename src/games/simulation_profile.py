@@ -0,0 +1,191 @@
+from collections import defaultdict
+from math import ceil, frexp, ldexp
+
+
+class Histogram:
+    """
+    A histogram with logarithmic buckets (about 9% wide), used to get the percentiles of a large number of values
+    (e.g., latencies) with a fixed amount of memory. The percentiles are interpolated inside their bucket, and the
+    count, mean, minimum and maximum are exact. Exact histograms count each value on its own instead, for integer
+    values with few distinct values (e.g., the length of the games), so their percentiles are exact too
+    """
+    SUB_BUCKETS = 8
+
+    """
+    :param exact: if True, each distinct value is counted on its own
+    """
+    def __init__(self, exact: bool = False):
+        self.__exact = exact
+        self.__buckets = defaultdict(int)
+        self.__count = 0
+        self.__total = 0.0
+        self.__min = None
+        self.__max = 0.0
+
+    """
+    adds a value to the histogram
+    :param value: a value greater than or equal to 0
+    """
+    def add(self, value):
+        self.__buckets[value if self.__exact else Histogram.__get_bucket(value)] += 1
+        self.__count += 1
+        self.__total += value
+        if value > self.__max:
+            self.__max = value
+        if self.__min is None or value < self.__min:
+            self.__min = value
+
+    """
+    adds all the values of another histogram
+    """
+    def merge(self, other):
+        for bucket, count in other.__buckets.items():
+            self.__buckets[bucket] += count
+        self.__count += other.__count
+        self.__total += other.__total
+        self.__max = max(self.__max, other.__max)
+        if other.__min is not None and (self.__min is None or other.__min < self.__min):
+            self.__min = other.__min
+
+    @staticmethod
+    def __get_bucket(value):
+        if value <= 0:
+            return None
+        mantissa, exponent = frexp(value)
+        return exponent * Histogram.SUB_BUCKETS + int((mantissa - 0.5) * 2 * Histogram.SUB_BUCKETS)
+
+    # gets the lower and upper bounds of the values of a bucket
+    @staticmethod
+    def __get_bounds(bucket):
+        if bucket is None:
+            return 0.0, 0.0
+        exponent, sub_bucket = divmod(bucket, Histogram.SUB_BUCKETS)
+        return (ldexp(0.5 + sub_bucket / (2 * Histogram.SUB_BUCKETS), exponent),
+                ldexp(0.5 + (sub_bucket + 1) / (2 * Histogram.SUB_BUCKETS), exponent))
+
+    def get_count(self):
+        return self.__count
+
+    def get_mean(self):
+        return self.__total / self.__count if self.__count > 0 else 0.0
+
+    def get_min(self):
+        return 0.0 if self.__min is None else self.__min
+
+    def get_max(self):
+        return self.__max
+
+    """
+    gets the given percentile, as the value of that rank among the sorted values. Exact histograms return one of the
+    values, and the others assume the values of a bucket are spread evenly inside it
+    :param percentile: the percentile, between [0, 100]
+    """
+    def get_percentile(self, percentile: float):
+        if self.__count == 0:
+            return 0.0
+        rank = max(1, ceil(percentile / 100 * self.__count))
+        # the smallest and largest values are known exactly
+        if rank == 1:
+            return self.get_min()
+        if rank == self.__count:
+            return self.__max
+        seen = 0
+        for bucket in sorted(self.__buckets, key=lambda b: -1 if b is None else b):
+            count = self.__buckets[bucket]
+            if seen + count >= rank:
+                if self.__exact:
+                    return bucket
+                low, high = Histogram.__get_bounds(bucket)
+                value = low + (high - low) * (rank - seen - 0.5) / count
+                return min(max(value, self.__min), self.__max)
+            seen += count
+        return self.__max
+
+
+class SimulationProfile:
+    """
+    Latency histograms per player and per phase of the simulation (e.g., get_action or event_action), plus the number
+    of invalid actions of each player and the length of the games
+    """
+    GET_ACTION = "get_action"
+    EVENT_NEW_GAME = "event_new_game"
+    EVENT_ACTION = "event_action"
+    EVENT_RESULT = "event_result"
+    EVENT_END_GAME = "event_end_game"
+
+    def __init__(self):
+        """
+        the latencies in seconds, by player name and phase
+        """
+        self.__latencies = defaultdict(lambda: defaultdict(Histogram))
+
+        """
+        the number of invalid actions returned by each player (each one makes the simulator ask again)
+        """
+        self.__invalid_actions = defaultdict(int)
+
+        """
+        the number of turns of each game
+        """
+        self.__game_lengths = Histogram(exact=True)
+
+    # defaultdicts with lambdas can't be pickled (e.g., to be sent from a worker process)
+    def __getstate__(self):
+        return {
+            'latencies': {name: dict(phases) for name, phases in self.__latencies.items()},
+            'invalid_actions': dict(self.__invalid_actions),
+            'game_lengths': self.__game_lengths
+        }
+
+    def __setstate__(self, state):
+        self.__init__()
+        for name, phases in state['latencies'].items():
+            self.__latencies[name].update(phases)
+        self.__invalid_actions.update(state['invalid_actions'])
+        self.__game_lengths = state['game_lengths']
+
+    def record_latency(self, name: str, phase: str, seconds: float):
+        self.__latencies[name][phase].add(seconds)
+
+    def record_invalid_action(self, name: str):
+        self.__invalid_actions[name] += 1
+
+    def record_game_length(self, num_turns: int):
+        self.__game_lengths.add(num_turns)
+
+    """
+    adds all the measurements of another profile (e.g., from a worker process)
+    """
+    def merge(self, other):
+        for name, phases in other.__latencies.items():
+            for phase, histogram in phases.items():
+                self.__latencies[name][phase].merge(histogram)
+        for name, count in other.__invalid_actions.items():
+            self.__invalid_actions[name] += count
+        self.__game_lengths.merge(other.__game_lengths)
+
+    def get_latencies(self, name: str) -> dict:
+        return self.__latencies[name]
+
+    def get_invalid_actions(self, name: str) -> int:
+        return self.__invalid_actions[name]
+
+    def get_game_lengths(self) -> Histogram:
+        return self.__game_lengths
+
+    """
+    prints the latencies of each player, in microseconds
+    :param names: the names of the players
+    """
+    def print_stats(self, names: list):
+        for name in names:
+            phases = []
+            for phase, histogram in self.__latencies[name].items():
+                phases.append(f"{phase}: n={histogram.get_count()} p50={histogram.get_percentile(50) * 1e6:.1f}us "
+                              f"p95={histogram.get_percentile(95) * 1e6:.1f}us p99={histogram.get_percentile(99) * 1e6:.1f}us "
+                              f"max={histogram.get_max() * 1e6:.1f}us")
+            print(f"Player {name} | {' | '.join(phases)} | invalid actions: {self.__invalid_actions[name]}")
+
+        lengths = self.__game_lengths
+        print(f"Game length | mean: {lengths.get_mean():.1f} | p50: {lengths.get_percentile(50):.0f} | "
+              f"p95: {lengths.get_percentile(95):.0f} | max: {lengths.get_max()}")
@@ -78,3 +78,25 @@ class State(ABC):
     @abstractmethod
     def before_results(self):
         pass
+
+
+class StateView:
+    """
+    A read-only view over a game state. It exposes every method of the state except the ones that change it, so the
+    simulator can hand the live state to the players instead of copying it on every turn.
+    The view always reflects the current state of the game: players that need to keep or change a state must clone it.
+    """
+    __MUTATORS = ('update', 'play', 'undo')
+
+    def __init__(self, state: State):
+        self.__state = state
+
+    def __getattr__(self, name):
+        if name in StateView.__MUTATORS:
+            raise AttributeError(f"'{name}' can't be called on a read-only state, clone it first")
+
+        attribute = getattr(self.__state, name)
+        # cache the bound method so the next lookups don't go through __getattr__ again
+        if callable(attribute):
+            setattr(self, name, attribute)
+        return attribute
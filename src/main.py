@@ -1,37 +1,57 @@
 import argparse
+import inspect
 import itertools
+import os
+import random
 from collections import namedtuple, defaultdict
+from concurrent.futures import ProcessPoolExecutor
 from tqdm import tqdm
 
 from constants import AVAILABLE_GAME_TYPES, AVAILABLE_PLAYER_TYPES
+from games.matchup_cache import MatchupCache
+from games.result_store import ResultStore
+
+# Define a namedtuple for a Player
+Player = namedtuple('Player', ['name', 'type'])
+
+# number of standard errors used by the adaptive mode to decide a matchup (99.9% confidence)
+DECISION_Z = 3.29
+
+# number of iterations between two checks of the adaptive mode
+DECISION_INTERVAL = 10
 
 def run_simulation(game_settings):
     removed_players = []
 
+    if game_settings['seed'] is not None:
+        random.seed(game_settings['seed'])
+
+    # pairs that already met in an earlier elimination round (or run) are not simulated again
+    cache = MatchupCache(game_settings['matchup_cache'])
+
+    # the pool is shared by all elimination rounds, so workers are only started once
+    executor = ProcessPoolExecutor(max_workers=game_settings['workers']) if game_settings['workers'] > 1 else None
+
     while len(game_settings['players']) > 1:
         scores = defaultdict(int)
         match_results = defaultdict(dict)
 
-        for player1, player2 in itertools.combinations(game_settings['players'], 2):
-            simulator = game_settings['game']([player1, player2])
-            print(f"Simulation: {player1.get_name()} VS {player2.get_name()}")
+        pairs = list(itertools.combinations(game_settings['players'], 2))
+        if executor is None:
+            simulators = (run_matchup(game_settings, cache, player1, player2) for player1, player2 in pairs)
+        else:
+            simulators = run_matchups_in_pool(executor, game_settings, cache, pairs)
 
+        for (player1, player2), simulator in zip(pairs, simulators):
             names = {player1.get_name(): player1, player2.get_name(): player2}
 
-            # Run initial iterations with progress bar
-            for _ in tqdm(range(game_settings['num_iterations']), desc="Running iterations"):
-                run_game_iteration(simulator, game_settings['seat_permutation'])
-
-            # Run additional iterations if there's a draw
-            while check_draw(simulator):
-                run_game_iteration(simulator, game_settings['seat_permutation'])
-
             update_scores(scores, simulator, names)
 
             # Update match results for cross table
             update_match_results(match_results, simulator, player1, player2)
 
             simulator.print_stats()
+            simulator.print_profile()
 
         # Print cross table and leaderboard before removing a player
         print_cross_table(match_results)
@@ -40,10 +60,219 @@ def run_simulation(game_settings):
         removed_player = remove_worst_player(game_settings['players'], scores)
         removed_players.insert(0, removed_player)
 
+    if executor is not None:
+        executor.shutdown()
+
     last_remaining_player = game_settings['players'][0]
     removed_players.insert(0, last_remaining_player)
     print_leaderboard(removed_players, final=True)
 
+def run_matchup(game_settings, cache, player1, player2):
+    key = get_matchup_key(game_settings, player1, player2)
+    cached = cache.get(key)
+
+    simulator = create_simulator(game_settings, cached, player1, player2)
+    print(f"Simulation: {player1.get_name()} VS {player2.get_name()}")
+
+    seed = get_matchup_seed(game_settings['seed'], get_player_specs([player1, player2]))
+    first_iteration = get_first_iteration(cached)
+    num_played = play_iterations(simulator, first_iteration, get_missing_iterations(game_settings, cached),
+                                 game_settings['seat_permutation'], game_settings['min_iterations'],
+                                 show_progress=True, seed=seed)
+
+    finish_matchup(game_settings, cache, key, cached, simulator, seed, first_iteration + num_played)
+    return simulator
+
+def get_matchup_key(game_settings, player1, player2):
+    settings = (game_settings['seat_permutation'], game_settings['min_iterations'],
+                game_settings['max_draw_iterations'], game_settings['seed'],
+                tuple(sorted(game_settings['game_options'].items())))
+    return MatchupCache.get_key(game_settings['game'], settings, [player1, player2])
+
+def get_first_iteration(cached):
+    # the iterations that broke a draw are counted, so topping up a matchup doesn't play them again
+    return 0 if cached is None else cached.next_iteration
+
+def get_missing_iterations(game_settings, cached):
+    # cached matchups are topped up if more iterations are requested than were played
+    played = 0 if cached is None else cached.num_iterations
+    return max(0, game_settings['num_iterations'] - played)
+
+def finish_matchup(game_settings, cache, key, cached, simulator, seed, next_iteration):
+    # a cached matchup that has nothing left to play had its draw resolved before it was cached
+    if cached is not None and get_missing_iterations(game_settings, cached) == 0:
+        simulator.get_result_store().close()
+        return
+
+    # the iterations that break a draw follow the ones that were played, so serial and pool runs resolve them alike
+    next_iteration += resolve_draw(simulator, game_settings['seat_permutation'], game_settings['max_draw_iterations'],
+                                   next_iteration, seed)
+    simulator.get_result_store().close()
+
+    # matchups stopped early by the adaptive mode are cached as complete, as playing on would not change the outcome
+    num_iterations = game_settings['num_iterations'] if cached is None else max(game_settings['num_iterations'], cached.num_iterations)
+    cache.put(key, num_iterations, simulator.get_running_scores(), next_iteration)
+
+def create_simulator(game_settings, cached, player1, player2):
+    simulator = game_settings['game']([player1, player2], **game_settings['game_options'])
+
+    # the results are streamed to disk instead of being kept in memory
+    if game_settings['results_dir'] is not None:
+        path = ResultStore.get_matchup_path(game_settings['results_dir'], [player1.get_name(), player2.get_name()])
+        simulator.get_result_store().stream_to(path, keep_in_memory=False)
+
+    if cached is not None:
+        simulator.add_running_scores(cached.scores)
+
+    if game_settings['profile']:
+        simulator.enable_profiling()
+
+    return simulator
+
+def run_matchups_in_pool(executor, game_settings, cache, pairs):
+    # each matchup is split into shards, and players are sent as (name, type) specs and rebuilt in the worker,
+    # instead of pickling live players
+    simulators = []
+    futures = []
+    for pair in pairs:
+        player_specs = get_player_specs(pair)
+        cached = cache.get(get_matchup_key(game_settings, *pair))
+        simulator = create_simulator(game_settings, cached, *pair)
+        first_iteration = get_first_iteration(cached)
+        seed = get_matchup_seed(game_settings['seed'], player_specs)
+
+        # games played in batches are played in one go, as splitting them would only make the batches smaller
+        num_shards = 1 if simulator.can_run_batched() else game_settings['shards']
+        shard_futures = []
+        for num_iterations in split_iterations(get_missing_iterations(game_settings, cached), num_shards):
+            if num_iterations > 0:
+                shard_futures.append(executor.submit(
+                    play_shard_from_specs, game_settings['game'], game_settings['game_options'], player_specs,
+                    first_iteration, num_iterations, game_settings['seat_permutation'], game_settings['min_iterations'],
+                    game_settings['profile'], seed))
+            first_iteration += num_iterations
+        simulators.append(simulator)
+        futures.append(shard_futures)
+
+    # results are merged in the same order as the serial run (and shards by their index), so the output is the same
+    for (player1, player2), simulator, shard_futures in zip(pairs, simulators, futures):
+        # each pair only plays once per round, so the cached outcome is the same as when the shards were submitted
+        key = get_matchup_key(game_settings, player1, player2)
+        cached = cache.get(key)
+
+        print(f"Simulation: {player1.get_name()} VS {player2.get_name()}")
+        num_played = 0
+        for future in shard_futures:
+            results, profile, num_iterations = future.result()
+            simulator.add_results(results)
+            if profile is not None:
+                simulator.get_profile().merge(profile)
+            num_played += num_iterations
+
+        seed = get_matchup_seed(game_settings['seed'], get_player_specs([player1, player2]))
+        finish_matchup(game_settings, cache, key, cached, simulator, seed, get_first_iteration(cached) + num_played)
+        yield simulator
+
+def split_iterations(num_iterations, num_shards):
+    # the first shards take one extra iteration when the split is not even
+    base, remainder = divmod(num_iterations, num_shards)
+    return [base + 1 if shard < remainder else base for shard in range(num_shards)]
+
+def get_player_specs(players):
+    return [Player(player.get_name(), player.__class__) for player in players]
+
+def get_matchup_seed(seed, player_specs):
+    # string seeds are hashed deterministically by random.seed, unlike hash() which changes between processes
+    if seed is None:
+        return None
+    return f"{seed}:{':'.join(spec.name for spec in player_specs)}"
+
+def start_iteration(simulator, iteration, seat_permutation, seed):
+    # the seats and the random numbers of an iteration only depend on its index in the matchup, so the results are the
+    # same however the iterations are split into shards, and topping up a cached matchup doesn't replay the same games
+    if seat_permutation:
+        simulator.set_current_permutation(iteration)
+    if seed is not None:
+        random.seed(f"{seed}:{iteration}")
+
+def play_shard_from_specs(game, game_options, player_specs, first_iteration, num_iterations, seat_permutation,
+                          min_iterations, profile, seed):
+    # worker processes may be forked with the parent's random state, so they are always reseeded
+    # (a None seed draws a fresh one from the operating system)
+    random.seed(seed)
+
+    simulator = game([spec.type(spec.name) for spec in player_specs], **game_options)
+    if profile:
+        simulator.enable_profiling()
+
+    num_played = play_iterations(simulator, first_iteration, num_iterations, seat_permutation, min_iterations, seed=seed)
+    return simulator.get_result_store(), simulator.get_profile(), num_played
+
+"""
+plays the iterations of a matchup from its iteration number first_iteration, and returns the number of iterations
+that were played (less than num_iterations if the adaptive mode stopped the matchup)
+"""
+def play_iterations(simulator, first_iteration, num_iterations, seat_permutation, min_iterations=None,
+                    show_progress=False, seed=None):
+    if simulator.can_run_batched():
+        return play_batched_iterations(simulator, first_iteration, num_iterations, seat_permutation, min_iterations,
+                                       show_progress, seed)
+
+    # Run initial iterations with progress bar
+    for iteration in tqdm(range(1, num_iterations + 1), desc="Running iterations", disable=not show_progress):
+        start_iteration(simulator, first_iteration + iteration - 1, seat_permutation, seed)
+        run_game_iteration(simulator, seat_permutation)
+
+        # in adaptive mode, the matchup stops as soon as one of the players is clearly better
+        if min_iterations is not None and iteration >= min_iterations and iteration % DECISION_INTERVAL == 0 \
+                and is_decided(simulator):
+            return iteration
+    return num_iterations
+
+def play_batched_iterations(simulator, first_iteration, num_iterations, seat_permutation, min_iterations=None,
+                            show_progress=False, seed=None):
+    # each iteration plays one game in the current seats and, with seat permutation, one game in the swapped seats,
+    # so a batch of iterations is a batch of games in each seat order. In adaptive mode, the batches end at the same
+    # iterations the decision is checked at
+    if min_iterations is None:
+        batch_size = num_iterations
+    else:
+        batch_size = -(-min_iterations // DECISION_INTERVAL) * DECISION_INTERVAL
+
+    with tqdm(total=num_iterations, desc="Running iterations", disable=not show_progress) as progress:
+        iteration = 0
+        while iteration < num_iterations:
+            num_games = min(batch_size, num_iterations - iteration)
+            start_iteration(simulator, first_iteration + iteration, seat_permutation, seed)
+            simulator.run_batched_simulations(num_games)
+            if seat_permutation:
+                simulator.change_player_positions()
+                simulator.run_batched_simulations(num_games)
+            iteration += num_games
+            progress.update(num_games)
+
+            if min_iterations is not None:
+                if iteration % DECISION_INTERVAL == 0 and is_decided(simulator):
+                    break
+                batch_size = DECISION_INTERVAL
+    return iteration
+
+def is_decided(simulator):
+    # the matchup is decided once the confidence intervals of the average scores of both players no longer overlap.
+    # The bound is stricter than usual, as the test is repeated after every batch of iterations
+    (low1, high1), (low2, high2) = [score.get_confidence_interval(DECISION_Z) for score in simulator.get_running_scores().values()]
+    return high1 < low2 or high2 < low1
+
+def resolve_draw(simulator, seat_permutation, max_iterations, first_iteration, seed=None):
+    # Run additional iterations if there's a draw, up to a limit (e.g., mirror matches that always draw), and return
+    # the number of iterations that were played
+    for num_played in range(max_iterations):
+        if not check_draw(simulator):
+            return num_played
+        start_iteration(simulator, first_iteration + num_played, seat_permutation, seed)
+        run_game_iteration(simulator, seat_permutation)
+    return max_iterations
+
 def run_game_iteration(simulator, seat_permutation):
     simulator.run_simulation()
     if seat_permutation:
@@ -101,9 +330,6 @@ def print_leaderboard(players, final=False):
     print("=" * 60 + "\n")
 
 def main():
-    # Define a namedtuple for a Player
-    Player = namedtuple('Player', ['name', 'type'])
-
     parser = argparse.ArgumentParser(description='Simulate a game with various settings.')
 
     # Mandatory game type argument
@@ -118,6 +344,49 @@ def main():
     parser.add_argument('--num-iterations', type=int, default=10000,
                         help='Number of iterations in the simulation. Defaults to 10000.')
 
+    # Number of worker processes (default: 1)
+    parser.add_argument('--workers', type=int, default=1,
+                        help='Number of worker processes used to run the matchups in parallel. Defaults to 1 (serial).')
+
+    # Number of shards per matchup (default: 1)
+    parser.add_argument('--shards', type=int, default=1,
+                        help='Number of shards the iterations of each matchup are split into, so a single matchup can run on several workers. Defaults to 1.')
+
+    # Random seed (default: None)
+    parser.add_argument('--seed', type=int, default=None,
+                        help='Seed for the random number generators. Each iteration of a matchup derives its own seed from it, so results do not depend on the number of workers or shards. Defaults to a random seed.')
+
+    # Directory for the results of each game (default: None)
+    parser.add_argument('--results-dir', default=None,
+                        help='Directory where the results of every game are appended, as one CSV file per matchup. When set, the results are not kept in memory.')
+
+    # Adaptive mode (default: False)
+    parser.add_argument('--adaptive', action='store_true', default=False,
+                        help='Stop each matchup as soon as one of the players is clearly better. The number of iterations becomes the maximum. Defaults to False.')
+
+    # Minimum number of iterations in adaptive mode (default: 100)
+    parser.add_argument('--min-iterations', type=int, default=100,
+                        help='Minimum number of iterations of each matchup in adaptive mode. Defaults to 100.')
+
+    # Maximum number of iterations to break a draw (default: 1000)
+    parser.add_argument('--max-draw-iterations', type=int, default=1000,
+                        help='Maximum number of additional iterations played to break a draw. Defaults to 1000.')
+
+    # Profiling (default: False)
+    parser.add_argument('--profile', action='store_true', default=False,
+                        help='Measure the latency of each player (p50/p95/p99/max per move and per event), the invalid actions and the length of the games. Defaults to False.')
+
+    # Matchup cache file (default: None)
+    parser.add_argument('--matchup-cache', default=None,
+                        help='File where the outcome of each matchup is cached, so running the tournament again only simulates the new pairs of players.')
+
+    # Board size (default: the size of the game)
+    parser.add_argument('--num-rows', type=int, default=None,
+                        help='Number of rows of the board, for the games played on a board (connect4, minesweeper). Defaults to the size of the game.')
+
+    parser.add_argument('--num-cols', type=int, default=None,
+                        help='Number of columns of the board, for the games played on a board (connect4, minesweeper). Defaults to the size of the game.')
+
     # Player argument. This should be specified at least twice.
     parser.add_argument('--player', action='append', nargs=2, metavar=('NAME', 'TYPE'),
                         help='Add a player with a name and type. Requires two values. This option should be specified at least twice.')
@@ -128,6 +397,37 @@ def main():
     if args.player is None or len(args.player) < 2:
         parser.error('At least two --player arguments are required.')
 
+    if args.workers < 1:
+        parser.error('The number of workers must be 1 or over.')
+
+    if args.shards < 1:
+        parser.error('The number of shards must be 1 or over.')
+
+    if args.shards > 1 and args.workers <= 1:
+        parser.error('Splitting matchups into shards requires more than one worker.')
+
+    if args.adaptive and args.shards > 1:
+        parser.error('The adaptive mode can not be combined with shards, as each shard would decide on its own.')
+
+    if args.min_iterations < 1:
+        parser.error('The minimum number of iterations must be 1 or over.')
+
+    if args.max_draw_iterations < 0:
+        parser.error('The maximum number of iterations to break a draw must be 0 or over.')
+
+    # the options of the game are passed to the constructor of its simulator
+    game_options = {name: value for name, value in (('num_rows', args.num_rows), ('num_cols', args.num_cols))
+                    if value is not None}
+    game_parameters = inspect.signature(AVAILABLE_GAME_TYPES[args.game]).parameters
+    for name, value in game_options.items():
+        if name not in game_parameters:
+            parser.error(f"The game '{args.game}' is not played on a board of a configurable size.")
+        if value < 4:
+            parser.error('The number of rows and columns must be 4 or over.')
+
+    if args.results_dir is not None:
+        os.makedirs(args.results_dir, exist_ok=True)
+
     try:
         # Retrieve available player types for the selected game
         available_player_types = AVAILABLE_PLAYER_TYPES[args.game]
@@ -159,8 +459,17 @@ def main():
     # Your logic to build the object with these arguments
     game_settings = {
         'game': AVAILABLE_GAME_TYPES[args.game],
+        'game_options': game_options,
         'seat_permutation': args.seat_permutation,
         'num_iterations': args.num_iterations,
+        'min_iterations': args.min_iterations if args.adaptive else None,
+        'max_draw_iterations': args.max_draw_iterations,
+        'workers': args.workers,
+        'shards': args.shards,
+        'seed': args.seed,
+        'results_dir': args.results_dir,
+        'matchup_cache': args.matchup_cache,
+        'profile': args.profile,
         'players': players
     }
 
@@ -0,0 +1,28 @@
+import random
+import unittest
+
+from games.connect4.heuristic import evaluate_position
+from games.connect4.state import Connect4State
+try:
+    from games.connect4.vectorized_heuristic import evaluate_grid
+except ImportError:
+    # numpy is optional
+    evaluate_grid = None
+
+
+@unittest.skipIf(evaluate_grid is None, "numpy is not installed")
+class TestHeuristic(unittest.TestCase):
+
+    def test_scores_like_the_grid_heuristic(self):
+        rng = random.Random(5)
+        for num_rows, num_cols in [(6, 7), (4, 4), (5, 9), (9, 5), (12, 12)]:
+            for _game in range(20):
+                state = Connect4State(num_rows, num_cols)
+                while not state.is_finished():
+                    for pos in range(2):
+                        self.assertEqual(evaluate_position(state, pos), evaluate_grid(state.get_grid(), pos))
+                    state.update(rng.choice(state.get_possible_actions()))
+
+
+if __name__ == '__main__':
+    unittest.main()
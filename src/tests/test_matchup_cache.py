@@ -0,0 +1,70 @@
+import os
+import tempfile
+import unittest
+
+from constants import AVAILABLE_GAME_TYPES
+from games.hlpoker.players.always_fold import AlwaysFoldHLPokerPlayer
+from games.matchup_cache import MatchupCache
+from main import get_matchup_key, run_matchup
+
+
+def get_game_settings(num_iterations, max_draw_iterations, seed=7):
+    return {
+        'game': AVAILABLE_GAME_TYPES['hlpoker'],
+        'game_options': {},
+        'seat_permutation': True,
+        'num_iterations': num_iterations,
+        'min_iterations': None,
+        'max_draw_iterations': max_draw_iterations,
+        'workers': 1,
+        'shards': 1,
+        'seed': seed,
+        'results_dir': None,
+        'matchup_cache': None,
+        'profile': False,
+        'players': []
+    }
+
+
+class TestMatchupCache(unittest.TestCase):
+
+    def setUp(self):
+        self.directory = tempfile.TemporaryDirectory()
+        self.path = os.path.join(self.directory.name, "matchups.pickle")
+
+        # both players always fold, so each pair of games ends in a draw that can't be broken
+        self.players = [AlwaysFoldHLPokerPlayer("Fold1"), AlwaysFoldHLPokerPlayer("Fold2")]
+
+    def tearDown(self):
+        self.directory.cleanup()
+
+    def play(self, game_settings):
+        return run_matchup(game_settings, MatchupCache(self.path), *self.players)
+
+    def test_cached_draw_is_not_replayed(self):
+        simulator = self.play(get_game_settings(10, 5))
+        self.assertEqual(len(simulator.get_result_store()), 2 * (10 + 5))
+
+        simulator = self.play(get_game_settings(10, 5))
+        self.assertEqual(len(simulator.get_result_store()), 0)
+        self.assertEqual(simulator.get_num_games(), 2 * (10 + 5))
+
+    def test_top_up_continues_after_the_draw_iterations(self):
+        self.play(get_game_settings(10, 5))
+        game_settings = get_game_settings(12, 5)
+        cached = MatchupCache(self.path).get(get_matchup_key(game_settings, *self.players))
+        self.assertEqual(cached.next_iteration, 15)
+
+        simulator = self.play(game_settings)
+        self.assertEqual(len(simulator.get_result_store()), 2 * (2 + 5))
+        cached = MatchupCache(self.path).get(get_matchup_key(game_settings, *self.players))
+        self.assertEqual(cached.next_iteration, 22)
+
+    def test_key_depends_on_the_draw_limit_and_the_seed(self):
+        key = get_matchup_key(get_game_settings(10, 5), *self.players)
+        self.assertNotEqual(key, get_matchup_key(get_game_settings(10, 6), *self.players))
+        self.assertNotEqual(key, get_matchup_key(get_game_settings(10, 5, seed=8), *self.players))
+
+
+if __name__ == '__main__':
+    unittest.main()
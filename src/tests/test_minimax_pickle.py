@@ -0,0 +1,38 @@
+import pickle
+import unittest
+
+from games.connect4.opening_book import DEFAULT_BOOK_PATH
+from games.connect4.players.minimax import MinimaxConnect4Player
+from games.connect4.state import Connect4State
+
+
+class TestMinimaxPickle(unittest.TestCase):
+
+    def test_round_trip_reloads_the_opening_book(self):
+        player = MinimaxConnect4Player("Minimax", 2)
+        player.set_current_pos(0)
+        self.assertIsNotNone(player.opening_book)
+        expected = player.opening_book.get_action(Connect4State())
+        self.assertIsNotNone(expected)
+
+        copy = pickle.loads(pickle.dumps(player))
+
+        self.assertEqual(copy.get_name(), "Minimax")
+        self.assertEqual(copy.opening_book_path, DEFAULT_BOOK_PATH)
+        self.assertIsNotNone(copy.opening_book)
+        self.assertEqual(copy.get_action(Connect4State()).get_col(), expected.get_col())
+
+    def test_round_trip_without_opening_book(self):
+        player = MinimaxConnect4Player("Minimax", 2, opening_book=None)
+        player.set_current_pos(0)
+        player.get_action(Connect4State())
+
+        copy = pickle.loads(pickle.dumps(player))
+
+        self.assertIsNone(copy.opening_book)
+        self.assertIsNone(copy.transposition_table)
+        self.assertEqual(copy.get_action(Connect4State()).get_col(), player.get_action(Connect4State()).get_col())
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,53 @@
+import random
+import unittest
+
+from games.connect4.action import Connect4Action
+from games.connect4.players.minimax import MinimaxConnect4Player
+from games.connect4.state import Connect4State
+from games.connect4.transposition_table import get_shared_table
+
+
+def get_positions(num_positions, seed=3):
+    # positions of random games without a winning move, so the players search them
+    rng = random.Random(seed)
+    positions = []
+    while len(positions) < num_positions:
+        state = Connect4State()
+        for _move in range(rng.randint(4, 12)):
+            state.update(rng.choice(state.get_possible_actions()))
+            if state.is_finished():
+                break
+        if not state.is_finished() and not any(state.is_winning_action(action, pos)
+                                               for action in state.get_possible_actions() for pos in range(2)):
+            positions.append(state)
+    return positions
+
+
+def play_positions(player, positions):
+    # the workers are forked with the tables of this process, so each player starts like in a new process
+    get_shared_table.cache_clear()
+    cols = []
+    for state in positions:
+        player.set_current_pos(state.get_acting_player())
+        cols.append(player.get_action(state.clone()).get_col())
+    return cols
+
+
+class TestParallelSearch(unittest.TestCase):
+
+    def test_moves_only_depend_on_the_number_of_workers(self):
+        positions = get_positions(4)
+        first = play_positions(MinimaxConnect4Player("Minimax", 5, opening_book=None, workers=2), positions)
+        second = play_positions(MinimaxConnect4Player("Minimax", 5, opening_book=None, workers=2), positions)
+        self.assertEqual(first, second)
+        for state, col in zip(positions, first):
+            self.assertTrue(state.validate_action(Connect4Action(col)))
+
+    def test_completes_every_depth(self):
+        player = MinimaxConnect4Player("Minimax", 4, opening_book=None, workers=3)
+        play_positions(player, get_positions(1))
+        self.assertEqual(player.get_completed_depth(), 4)
+
+
+if __name__ == '__main__':
+    unittest.main()
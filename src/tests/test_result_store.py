@@ -0,0 +1,46 @@
+import math
+import os
+import tempfile
+import unittest
+
+from games.result_store import ResultStore
+
+
+class TestResultStore(unittest.TestCase):
+
+    def setUp(self):
+        self.directory = tempfile.TemporaryDirectory()
+        self.path = os.path.join(self.directory.name, "results.csv")
+
+    def tearDown(self):
+        self.directory.cleanup()
+
+    # writes the results of some games to the file, and reads them back
+    def round_trip(self, results: list) -> ResultStore:
+        store = ResultStore(["a", "b"])
+        store.stream_to(self.path, keep_in_memory=False)
+        for game, result in enumerate(results):
+            store.append(result, game % 2, game + 1)
+        store.close()
+        return ResultStore.read_csv(self.path)
+
+    def test_integer_scores_are_read_as_integers(self):
+        store = self.round_trip([{"a": 1, "b": -1}, {"a": 0, "b": 0}])
+        self.assertEqual(list(store.iter_results()), [{"a": 1, "b": -1}, {"a": 0, "b": 0}])
+        self.assertTrue(all(isinstance(score, int) for result in store.iter_results() for score in result.values()))
+        self.assertEqual(list(store.get_permutations()), [0, 1])
+        self.assertEqual(list(store.get_lengths()), [1, 2])
+
+    def test_float_scores_are_read_as_floats(self):
+        store = self.round_trip([{"a": 1e-05, "b": 2}, {"a": math.inf, "b": -0.5}])
+        self.assertEqual(list(store.get_scores("a")), [1e-05, math.inf])
+        self.assertEqual(list(store.get_scores("b")), [2.0, -0.5])
+
+    def test_nan_scores_are_read(self):
+        store = self.round_trip([{"a": math.nan, "b": 1}])
+        self.assertTrue(math.isnan(store.get_scores("a")[0]))
+        self.assertEqual(store.get_scores("b")[0], 1)
+
+
+if __name__ == '__main__':
+    unittest.main()
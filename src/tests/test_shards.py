@@ -0,0 +1,60 @@
+import unittest
+from concurrent.futures import ProcessPoolExecutor
+
+from constants import AVAILABLE_GAME_TYPES
+from games.hlpoker.players.always_call import AlwaysCallHLPokerPlayer
+from games.hlpoker.players.random import RandomHLPokerPlayer
+from games.matchup_cache import MatchupCache
+from main import run_matchup, run_matchups_in_pool
+
+
+def get_game_settings(players, shards):
+    return {
+        'game': AVAILABLE_GAME_TYPES['hlpoker'],
+        'game_options': {},
+        'seat_permutation': True,
+        'num_iterations': 50,
+        'min_iterations': None,
+        'max_draw_iterations': 10,
+        'workers': 2,
+        'shards': shards,
+        'seed': 7,
+        'results_dir': None,
+        'matchup_cache': None,
+        'profile': False,
+        'players': players
+    }
+
+
+# gets the result, seat permutation and length of every game of a matchup, in the order they were stored
+def get_games(simulator):
+    return list(simulator.get_result_store().iter_games())
+
+
+class TestShards(unittest.TestCase):
+
+    def setUp(self):
+        self.players = [RandomHLPokerPlayer("Random"), AlwaysCallHLPokerPlayer("AlwaysCall")]
+        self.executor = ProcessPoolExecutor(max_workers=2)
+
+    def tearDown(self):
+        self.executor.shutdown()
+
+    def play_in_pool(self, shards):
+        game_settings = get_game_settings(self.players, shards)
+        [simulator] = run_matchups_in_pool(self.executor, game_settings, MatchupCache(), [tuple(self.players)])
+        return simulator
+
+    def test_shards_store_the_same_results(self):
+        one_shard = self.play_in_pool(1)
+        three_shards = self.play_in_pool(3)
+        self.assertEqual(get_games(one_shard), get_games(three_shards))
+        self.assertEqual(one_shard.get_global_score(), three_shards.get_global_score())
+
+    def test_serial_run_stores_the_same_results(self):
+        serial = run_matchup(get_game_settings(self.players, 1), MatchupCache(), *self.players)
+        self.assertEqual(get_games(serial), get_games(self.play_in_pool(3)))
+
+
+if __name__ == '__main__':
+    unittest.main()
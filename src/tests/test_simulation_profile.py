@@ -0,0 +1,39 @@
+import unittest
+
+from games.simulation_profile import Histogram
+
+
+class TestHistogram(unittest.TestCase):
+
+    def test_exact_percentiles_are_values(self):
+        histogram = Histogram(exact=True)
+        for value in [1, 1, 2, 9, 9, 9, 9, 12, 3, 4]:
+            histogram.add(value)
+        self.assertEqual(histogram.get_percentile(50), 4)
+        self.assertEqual(histogram.get_percentile(95), 12)
+        self.assertEqual(histogram.get_percentile(10), 1)
+
+    def test_percentiles_are_interpolated_inside_the_buckets(self):
+        histogram = Histogram()
+        values = [i * 1e-6 for i in range(1, 1001)]
+        for value in values:
+            histogram.add(value)
+        for percentile in (50, 95, 99):
+            expected = values[percentile * len(values) // 100 - 1]
+            self.assertAlmostEqual(histogram.get_percentile(percentile), expected, delta=expected * 0.02)
+        self.assertLessEqual(histogram.get_percentile(100), histogram.get_max())
+
+    def test_merge_keeps_the_minimum_and_maximum(self):
+        histogram = Histogram()
+        other = Histogram()
+        histogram.add(2.0)
+        other.add(0.5)
+        other.add(8.0)
+        histogram.merge(other)
+        self.assertEqual(histogram.get_min(), 0.5)
+        self.assertEqual(histogram.get_max(), 8.0)
+        self.assertEqual(histogram.get_percentile(0), 0.5)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,58 @@
+import os
+import tempfile
+import unittest
+from concurrent.futures import ProcessPoolExecutor
+
+from games.connect4.solved_cache import SolvedPositionCache, load_cache
+
+
+def solve_in_worker(path, key, score):
+    # the position is only buffered, and saved when the worker process exits
+    cache = load_cache(path, 6, 7)
+    cache.put(key, score)
+    return cache.get_num_unsaved()
+
+
+class TestSolvedCache(unittest.TestCase):
+
+    def setUp(self):
+        self.directory = tempfile.TemporaryDirectory()
+        self.path = os.path.join(self.directory.name, "solved.bin")
+
+    def tearDown(self):
+        self.directory.cleanup()
+
+    def test_save_merges_the_positions_saved_by_other_caches(self):
+        first = SolvedPositionCache(self.path)
+        second = SolvedPositionCache(self.path)
+        for key in range(0, 100, 2):
+            first.put(key, key % 7)
+        for key in [1, 4, 51, 99, 200]:
+            second.put(key, key % 7)
+
+        first.save()
+        second.save()
+        self.assertFalse(second.is_dirty())
+
+        reloaded = SolvedPositionCache(self.path)
+        keys = sorted(set(range(0, 100, 2)) | {1, 51, 99, 200})
+        self.assertEqual(len(reloaded), len(keys))
+        for key in keys:
+            self.assertEqual(reloaded.get(key), key % 7)
+        self.assertIsNone(reloaded.get(3))
+        for cache in [first, second, reloaded]:
+            cache.close()
+
+    def test_workers_save_their_positions_when_they_exit(self):
+        with ProcessPoolExecutor(max_workers=2) as executor:
+            unsaved = list(executor.map(solve_in_worker, [self.path] * 2, [10, 20], [3, -2]))
+        self.assertTrue(all(num_unsaved > 0 for num_unsaved in unsaved))
+
+        reloaded = SolvedPositionCache(self.path)
+        self.assertEqual(reloaded.get(10), 3)
+        self.assertEqual(reloaded.get(20), -2)
+        reloaded.close()
+
+
+if __name__ == '__main__':
+    unittest.main()